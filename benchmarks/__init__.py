@@ -0,0 +1,6 @@
+"""
+Нагрузочный стенд: сидирует базу, гоняет приложение из src/main.py
+в процессе через ASGI-клиент и печатает задержки по маршрутам.
+
+    python -m benchmarks.run --database-url sqlite+aiosqlite:///bench.db
+"""
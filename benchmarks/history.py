@@ -0,0 +1,214 @@
+"""
+    python -m benchmarks.history --database-url sqlite+aiosqlite:///bench.db \
+        --tenders 200 --edits 50 --lookups 2000
+
+Сравнивает историю тендеров полными копиями (старая tender_history)
+и обратными дельтами со снимками (tender_revision): размер таблиц
+с индексами и задержку восстановления случайной версии.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+from uuid import uuid4
+
+from benchmarks.run import configure  # заодно подключает src в sys.path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///bench.db")
+    parser.add_argument("--tenders", type=int, default=200)
+    parser.add_argument("--edits", type=int, default=50, help="правок на тендер")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def _edit(rng: random.Random, state: dict, version: int) -> dict:
+    from core.models.business_enums import ServiceType
+
+    state = dict(state)
+    field = rng.choice(["name", "description", "description", "service_type"])
+    if field == "name":
+        state["name"] = f"tender {version} " + "n" * rng.randrange(10, 60)
+    elif field == "description":
+        state["description"] = f"v{version} " + "d" * rng.randrange(100, 450)
+    else:
+        state["service_type"] = rng.choice(list(ServiceType)).value
+    return state
+
+
+async def table_bytes(conn, table: str) -> int:
+    if conn.dialect.name == "postgresql":
+        stmt = f"SELECT pg_total_relation_size('{table}')"
+    else:
+        stmt = (
+            "SELECT SUM(d.pgsize) FROM dbstat d "
+            "JOIN sqlite_master m ON d.name = m.name "
+            f"WHERE m.tbl_name = '{table}'"
+        )
+    return (await conn.exec_driver_sql(stmt)).scalar() or 0
+
+
+async def seed(engine, args, rng: random.Random):
+    from sqlalchemy import insert
+
+    from core.history import new_revision
+    from core.models.base import Base
+    from core.models.business_enums import OrganizationType, TenderStatus
+    from core.models.business_models import (
+        Employee,
+        Organization,
+        Tender,
+        TenderRevision,
+    )
+    from scripts.convert_tender_history import legacy_tender_history
+
+    organization_id, username = uuid4(), "history_user"
+    tenders, revisions, legacy = [], [], []
+    for _ in range(args.tenders):
+        tender_id = uuid4()
+        states = [
+            {"name": "tender", "description": "initial", "service_type": "Delivery"}
+        ]
+        for version in range(2, args.edits + 2):
+            states.append(_edit(rng, states[-1], version))
+        for version, (old, new) in enumerate(zip(states, states[1:]), start=1):
+            owner = SimpleNamespace(id=tender_id, version=version)
+            revision = new_revision(TenderRevision, "tender_id", owner, old, new)
+            revisions.append(
+                {
+                    "tender_id": tender_id,
+                    "version": version,
+                    "is_snapshot": revision.is_snapshot,
+                    "changes": revision.changes,
+                }
+            )
+            legacy.append(
+                {
+                    "id": uuid4(),
+                    "refer_tender_id": tender_id,
+                    "version": version,
+                    "status": TenderStatus.PUBLISHED,
+                    "organization_id": organization_id,
+                    "creator_username": username,
+                    **old,
+                }
+            )
+        tenders.append(
+            {
+                "id": tender_id,
+                "version": len(states),
+                "status": TenderStatus.PUBLISHED,
+                "organization_id": organization_id,
+                "creator_username": username,
+                **states[-1],
+            }
+        )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(legacy_tender_history.drop, checkfirst=True)
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(legacy_tender_history.create)
+        await conn.execute(
+            insert(Employee),
+            [{"username": username, "first_name": "h", "last_name": "h"}],
+        )
+        await conn.execute(
+            insert(Organization),
+            [{"id": organization_id, "name": "h", "type": OrganizationType.LLC}],
+        )
+        await conn.execute(insert(Tender), _typed(tenders))
+        for start in range(0, len(revisions), 5000):
+            await conn.execute(insert(TenderRevision), revisions[start : start + 5000])
+            await conn.execute(
+                legacy_tender_history.insert(),
+                _typed(legacy[start : start + 5000]),
+            )
+    return [(row["id"], row["version"]) for row in tenders]
+
+
+def _typed(rows: List[dict]) -> List[dict]:
+    # состояния собраны в JSON-виде, колонке Enum нужен член перечисления
+    from core.models.business_enums import ServiceType
+
+    return [{**row, "service_type": ServiceType(row["service_type"])} for row in rows]
+
+
+def _summary(values: List[float]) -> str:
+    from benchmarks.report import percentile
+
+    values = sorted(values)
+    return (
+        f"p50 {percentile(values, 0.5) * 1000:7.2f} ms  "
+        f"p95 {percentile(values, 0.95) * 1000:7.2f} ms  "
+        f"p99 {percentile(values, 0.99) * 1000:7.2f} ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    configure(args.database_url)
+
+    from sqlalchemy import select
+
+    from api.tenders import crud
+    from core.models.business_models import Tender
+    from core.models.db_helper import database_helper
+    from scripts.convert_tender_history import legacy_tender_history
+
+    rng = random.Random(args.seed)
+    legacy = legacy_tender_history.c
+    timings: Dict[str, List[float]] = {"full copy": [], "delta": []}
+    try:
+        tenders = await seed(database_helper.engine, args, rng)
+        async with database_helper.engine.connect() as conn:
+            sizes = {
+                "full copy": await table_bytes(conn, "tender_history"),
+                "delta": await table_bytes(conn, "tender_revision"),
+            }
+
+        async with database_helper.session_factory() as session:
+            live = {
+                tender.id: tender
+                for tender in await session.scalars(
+                    select(Tender).where(Tender.id.in_([t for t, _ in tenders]))
+                )
+            }
+            for _ in range(args.lookups):
+                tender_id, current = rng.choice(tenders)
+                version = rng.randrange(1, current)
+
+                started = time.perf_counter()
+                await session.execute(
+                    select(legacy_tender_history).where(
+                        legacy.refer_tender_id == tender_id,
+                        legacy.creator_username == "history_user",
+                        legacy.version == version,
+                    )
+                )
+                timings["full copy"].append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                states = await crud.get_tender_versions(
+                    session, live[tender_id], [version]
+                )
+                timings["delta"].append(time.perf_counter() - started)
+                assert version in states
+    finally:
+        await database_helper.dispose()
+
+    print(f"{args.tenders} tenders x {args.edits} edits, {args.lookups} lookups")
+    for scheme in ("full copy", "delta"):
+        print(
+            f"{scheme:10} {sizes[scheme] / 1024:10.0f} KiB  "
+            f"{_summary(timings[scheme])}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,121 @@
+"""
+    python -m benchmarks.membership --database-url sqlite+aiosqlite:///bench.db \
+        --checks 20000
+
+Проверка "пользователь отвечает за организацию": запросом в базу на
+каждую проверку против индекса членства в памяти.
+Печатает SQL-запросы и микросекунды на проверку; результаты сверяются.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.run import configure  # заодно подключает src в sys.path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///bench.db")
+    parser.add_argument("--organizations", type=int, default=20)
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+async def measure(session, probes, check) -> Tuple[float, float, List[object]]:
+    from sqlalchemy import event
+
+    queries = 0
+
+    def count(*_) -> None:
+        nonlocal queries
+        queries += 1
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        results = [await check(session, *probe) for probe in probes]
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count)
+    return queries / len(probes), elapsed * 1e6 / len(probes), results
+
+
+async def main(args: argparse.Namespace) -> None:
+    configure(args.database_url)
+
+    from sqlalchemy import select
+
+    from api.organization_responsibles.dependices import (
+        membership_cache,
+        user_is_responsible_for_organization,
+    )
+    from benchmarks.seed import SeedSizes, seed_database
+    from core.models.business_models import OrganizationResponsible
+    from core.models.db_helper import database_helper
+
+    async def query_is_responsible(session, organization_id, user_id) -> bool:
+        stmt = select(OrganizationResponsible.user_id).filter(
+            OrganizationResponsible.organization_id == organization_id,
+            OrganizationResponsible.user_id == user_id,
+        )
+        return (await session.scalars(stmt.limit(1))).first() is not None
+
+    rng = random.Random(args.seed)
+    sizes = SeedSizes(organizations=args.organizations, tenders=0, bids=0, decisions=0)
+    try:
+        await seed_database(database_helper.engine, sizes, rng)
+        async with database_helper.session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(
+                        OrganizationResponsible.organization_id,
+                        OrganizationResponsible.user_id,
+                    )
+                )
+            ).all()
+            members = [tuple(row) for row in rows]
+            organizations = sorted({organization for organization, _ in members})
+            users = [user for _, user in members]
+            # половина проверок - ответственный своей организации, половина -
+            # случайная пара, чаще всего чужая (отказ перепроверяется в базе)
+            probes = [
+                (
+                    rng.choice(members)
+                    if rng.random() < 0.5
+                    else (rng.choice(organizations), rng.choice(users))
+                )
+                for _ in range(args.checks)
+            ]
+            positive = [probe for probe in probes if probe in set(members)]
+            membership_cache.clear()
+            results: Dict[str, Tuple[float, float, List[object]]] = {
+                "is responsible, query": await measure(
+                    session, positive, query_is_responsible
+                ),
+                "is responsible, index": await measure(
+                    session, positive, user_is_responsible_for_organization
+                ),
+                "mixed, query": await measure(session, probes, query_is_responsible),
+                "mixed, index": await measure(
+                    session, probes, user_is_responsible_for_organization
+                ),
+            }
+    finally:
+        await database_helper.dispose()
+
+    for name in ("is responsible", "mixed"):
+        assert (
+            results[f"{name}, query"][2] == results[f"{name}, index"][2]
+        ), f"{name}: ответы расходятся"
+    print(f"{len(probes)} checks, {len(positive)} of them positive")
+    for name, (queries, micros, _) in results.items():
+        print(f"{name:22} {queries:5.2f} queries/check {micros:8.1f} us/check")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
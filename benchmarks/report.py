@@ -0,0 +1,84 @@
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+    queries: int = 0
+
+    def record(self, latency: float, status: int, queries: int) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.queries += queries
+
+    def summary(self, wall_time: float) -> Dict[str, object]:
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            "count": count,
+            "rps": count / wall_time if wall_time else 0.0,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": (values[-1] if values else 0.0) * 1000,
+            "queries_per_request": self.queries / count if count else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+        }
+
+
+def build_report(
+    routes: Dict[str, RouteStats], wall_time: float, meta: Dict[str, object]
+) -> Dict[str, object]:
+    total = RouteStats()
+    for stats in routes.values():
+        total.latencies.extend(stats.latencies)
+        total.queries += stats.queries
+        for status, count in stats.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + count
+    return {
+        "meta": {**meta, "wall_time_s": wall_time},
+        "routes": {
+            route: stats.summary(wall_time) for route, stats in sorted(routes.items())
+        },
+        "total": total.summary(wall_time),
+    }
+
+
+def _delta(current: float, baseline: Optional[float]) -> str:
+    if not baseline:
+        return ""
+    return f" ({(current - baseline) / baseline * 100:+.0f}%)"
+
+
+def print_report(report: Dict[str, object], baseline: Optional[dict] = None) -> None:
+    baseline_routes = (baseline or {}).get("routes", {})
+    header = (
+        f"{'route':<42} {'n':>6} {'rps':>8} {'p50 ms':>14} {'p95 ms':>14} "
+        f"{'p99 ms':>14} {'q/req':>6}  statuses"
+    )
+    print(header)
+    print("-" * len(header))
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for route, summary in rows:
+        base = baseline_routes.get(route, {}) if route != "TOTAL" else None
+        base = base if base is not None else (baseline or {}).get("total", {})
+        cells = [
+            f"{summary[key]:.2f}{_delta(summary[key], base.get(key))}"
+            for key in ("p50_ms", "p95_ms", "p99_ms")
+        ]
+        print(
+            f"{route:<42} {summary['count']:>6} {summary['rps']:>8.1f} "
+            f"{cells[0]:>14} {cells[1]:>14} {cells[2]:>14} "
+            f"{summary['queries_per_request']:>6.1f}  "
+            f"{json.dumps(summary['statuses'])}"
+        )
@@ -0,0 +1,165 @@
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.models.base import Base
+from core.models.business_enums import (
+    AuthorType,
+    BidStatus,
+    DecisionType,
+    OrganizationType,
+    ServiceType,
+    TenderStatus,
+)
+from core.models.business_models import (
+    Bid,
+    BidDecisionTally,
+    Decision,
+    Employee,
+    Organization,
+    OrganizationResponsible,
+    Tender,
+)
+
+RESPONSIBLES_PER_ORGANIZATION = 3
+INSERT_BATCH = 5000
+
+
+@dataclass
+class SeedSizes:
+    employees: int = 200
+    organizations: int = 20
+    tenders: int = 2000
+    bids: int = 5000
+    decisions: int = 2000
+
+
+@dataclass
+class Dataset:
+    """Идентификаторы засеянных строк, из которых строится нагрузка."""
+
+    usernames: List[str] = field(default_factory=list)
+    # organization_id -> usernames ответственных
+    responsibles: Dict[UUID, List[str]] = field(default_factory=dict)
+    # (tender_id, creator_username, service_type)
+    tenders: List[Tuple[UUID, str, str]] = field(default_factory=list)
+    # (bid_id, tender_id, organization_id)
+    bids: List[Tuple[UUID, UUID, UUID]] = field(default_factory=list)
+
+
+async def _insert(engine: AsyncEngine, model, rows: List[dict]) -> None:
+    async with engine.begin() as conn:
+        for start in range(0, len(rows), INSERT_BATCH):
+            await conn.execute(insert(model), rows[start : start + INSERT_BATCH])
+
+
+async def seed_database(
+    engine: AsyncEngine, sizes: SeedSizes, rng: random.Random, reset: bool = True
+) -> Dataset:
+    async with engine.begin() as conn:
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    dataset = Dataset()
+    employees = []
+    for index in range(sizes.employees):
+        username = f"bench_user_{index}"
+        dataset.usernames.append(username)
+        employees.append(
+            {"id": uuid4(), "username": username, "first_name": "b", "last_name": "b"}
+        )
+    await _insert(engine, Employee, employees)
+
+    organizations, responsibles = [], []
+    for index in range(sizes.organizations):
+        organization_id = uuid4()
+        organizations.append(
+            {
+                "id": organization_id,
+                "name": f"bench_org_{index}",
+                "description": "bench",
+                "type": OrganizationType.LLC,
+            }
+        )
+        members = rng.sample(employees, RESPONSIBLES_PER_ORGANIZATION)
+        dataset.responsibles[organization_id] = [m["username"] for m in members]
+        responsibles.extend(
+            {"id": uuid4(), "organization_id": organization_id, "user_id": m["id"]}
+            for m in members
+        )
+    await _insert(engine, Organization, organizations)
+    await _insert(engine, OrganizationResponsible, responsibles)
+
+    organization_ids = list(dataset.responsibles)
+    service_types = list(ServiceType)
+    tenders = []
+    for index in range(sizes.tenders):
+        organization_id = rng.choice(organization_ids)
+        creator = rng.choice(dataset.responsibles[organization_id])
+        service_type = rng.choice(service_types)
+        tender_id = uuid4()
+        dataset.tenders.append((tender_id, creator, service_type.value))
+        tenders.append(
+            {
+                "id": tender_id,
+                "name": f"tender {index:07d}",
+                "description": "bench tender",
+                "service_type": service_type,
+                "status": TenderStatus.PUBLISHED,
+                "organization_id": organization_id,
+                "creator_username": creator,
+            }
+        )
+    await _insert(engine, Tender, tenders)
+
+    bids = []
+    for index in range(sizes.bids):
+        tender_id = rng.choice(dataset.tenders)[0]
+        organization_id = rng.choice(organization_ids)
+        bid_id = uuid4()
+        dataset.bids.append((bid_id, tender_id, organization_id))
+        bids.append(
+            {
+                "id": bid_id,
+                "name": f"bid {index:07d}",
+                "description": "bench bid",
+                "status": BidStatus.PUBLISHED,
+                "tender_id": tender_id,
+                "author_type": AuthorType.ORGANIZATION,
+                "author_id": organization_id,
+            }
+        )
+    await _insert(engine, Bid, bids)
+
+    user_ids = {e["username"]: e["id"] for e in employees}
+    decisions, tallies = [], {}
+    for _ in range(sizes.decisions if dataset.bids else 0):
+        bid_id, _, organization_id = rng.choice(dataset.bids)
+        voter = rng.choice(dataset.responsibles[organization_id])
+        decisions.append(
+            {
+                "id": uuid4(),
+                "bid_id": bid_id,
+                "user_id": user_ids[voter],
+                "decision_type": DecisionType.APPROVED,
+            }
+        )
+        tally = tallies.setdefault(
+            bid_id,
+            {
+                "id": uuid4(),
+                "bid_id": bid_id,
+                "approved_count": 0,
+                "rejected_count": 0,
+                "quorum_target": RESPONSIBLES_PER_ORGANIZATION,
+            },
+        )
+        tally["approved_count"] += 1
+    await _insert(engine, Decision, decisions)
+    await _insert(engine, BidDecisionTally, list(tallies.values()))
+    return dataset
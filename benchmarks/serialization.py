@@ -0,0 +1,119 @@
+"""
+    python -m benchmarks.serialization --database-url sqlite+aiosqlite:///bench.db \
+        --rows 5000 --repeat 20
+
+Процессорное время на 1000 строк для списков тендеров и предложений:
+было - ORM-объекты и response_model (валидация from_attributes, dump в JSON-вид,
+json.dumps, как делает FastAPI); стало - строки нужных колонок и RowSerializer
+(orjson). Отдельно выборка и сериализация, результаты сверяются.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.run import configure  # заодно подключает src в sys.path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///bench.db")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def cpu_ms_per_1000(samples: List[float], rows: int) -> float:
+    return statistics.median(samples) * 1000 * 1000 / rows
+
+
+def response_model_dumps(adapter) -> Callable[[list], bytes]:
+    def dumps(objects: list) -> bytes:
+        content = adapter.dump_python(
+            adapter.validate_python(objects, from_attributes=True), mode="json"
+        )
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()
+
+    return dumps
+
+
+async def measure(session, model, serializer, schema, rows: int, repeat: int):
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+
+    dumps_before = response_model_dumps(TypeAdapter(List[schema]))
+    timings: Dict[str, List[float]] = {
+        "fetch orm": [],
+        "serialize response_model": [],
+        "fetch rows": [],
+        "serialize orjson": [],
+    }
+    for _ in range(repeat):
+        session.expunge_all()
+        started = time.process_time()
+        objects = (await session.scalars(select(model).limit(rows))).all()
+        timings["fetch orm"].append(time.process_time() - started)
+        started = time.process_time()
+        before = dumps_before(objects)
+        timings["serialize response_model"].append(time.process_time() - started)
+
+        started = time.process_time()
+        tuples = (await session.execute(serializer.select().limit(rows))).all()
+        timings["fetch rows"].append(time.process_time() - started)
+        started = time.process_time()
+        after = serializer.dumps(tuples)
+        timings["serialize orjson"].append(time.process_time() - started)
+
+        assert json.loads(before) == json.loads(after), "ответы расходятся"
+    count = len(objects)
+    return {name: cpu_ms_per_1000(samples, count) for name, samples in timings.items()}
+
+
+async def main(args: argparse.Namespace) -> None:
+    configure(args.database_url)
+
+    from api.bids.crud import BID_ROWS
+    from api.tenders.crud import TENDER_ROWS
+    from benchmarks.seed import SeedSizes, seed_database
+    from core.models.business_models import Bid, Tender
+    from core.models.db_helper import database_helper
+    from core.schemas.bid import BidResponse
+    from core.schemas.tender import TenderResponse
+
+    sizes = SeedSizes(tenders=args.rows, bids=args.rows, decisions=0)
+    try:
+        await seed_database(database_helper.engine, sizes, random.Random(args.seed))
+        async with database_helper.session_factory() as session:
+            results = {
+                "tenders": await measure(
+                    session, Tender, TENDER_ROWS, TenderResponse, args.rows, args.repeat
+                ),
+                "bids": await measure(
+                    session, Bid, BID_ROWS, BidResponse, args.rows, args.repeat
+                ),
+            }
+    finally:
+        await database_helper.dispose()
+
+    print(f"CPU ms per 1000 rows, median of {args.repeat}")
+    for entity, timings in results.items():
+        before = timings["fetch orm"] + timings["serialize response_model"]
+        after = timings["fetch rows"] + timings["serialize orjson"]
+        print(
+            f"{entity:8} fetch {timings['fetch orm']:6.2f} -> "
+            f"{timings['fetch rows']:6.2f}  "
+            f"serialize {timings['serialize response_model']:6.2f} -> "
+            f"{timings['serialize orjson']:5.2f}  "
+            f"total {before:6.2f} -> {after:6.2f} (x{before / after:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
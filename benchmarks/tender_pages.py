@@ -0,0 +1,97 @@
+"""
+    python -m benchmarks.tender_pages --database-url sqlite+aiosqlite:///bench.db \
+        --tenders 20000 --requests 5000 --concurrency 20 --write-share 0.02
+
+Пропускная способность GET /tenders/ без кэша страниц и с ним (lru и
+local-redis) на одной и той же нагрузке: первые страницы списков вперемешку
+с правками тендеров, которые сбрасывают кэш своего service_type.
+"""
+
+import argparse
+import asyncio
+import random
+from typing import Dict, List, Tuple
+
+from benchmarks.run import (  # заодно подключает src в sys.path
+    _count_query,
+    configure,
+    run_requests,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///bench.db")
+    parser.add_argument("--tenders", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5, help="глубина листания")
+    parser.add_argument("--write-share", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def build_specs(workload, rng: random.Random, args: argparse.Namespace) -> List:
+    specs = []
+    for _ in range(args.requests):
+        if rng.random() < args.write_share:
+            specs.append(workload.tender_edit())
+            continue
+        spec = workload.tenders_list()
+        spec.params["offset"] = rng.randrange(args.pages) * spec.params["limit"]
+        specs.append(spec)
+    return specs
+
+
+async def main(args: argparse.Namespace) -> None:
+    configure(args.database_url)
+
+    from sqlalchemy import event
+
+    import main as app_module
+    from api.tenders.dependies import tender_pages_cache
+    from benchmarks.report import RouteStats
+    from benchmarks.seed import SeedSizes, seed_database
+    from benchmarks.workload import DefaultWorkload
+    from core.config import ResponseCacheConfig, settings
+    from core.models.db_helper import database_helper
+    from core.response_cache import create_response_backend
+
+    rng = random.Random(args.seed)
+    sizes = SeedSizes(
+        employees=200, organizations=20, tenders=args.tenders, bids=0, decisions=0
+    )
+    results: Dict[str, Tuple[RouteStats, float]] = {}
+    try:
+        dataset = await seed_database(database_helper.engine, sizes, rng)
+        event.listen(
+            database_helper.engine.sync_engine, "before_cursor_execute", _count_query
+        )
+        for backend in ("off", "lru", "local-redis"):
+            config = ResponseCacheConfig(backend=backend)
+            tender_pages_cache.backend = create_response_backend(config)
+            workload = DefaultWorkload(dataset, settings.api.prefix, random.Random(1))
+            specs = build_specs(workload, random.Random(args.seed), args)
+            routes: Dict[str, RouteStats] = {}
+            wall_time = await run_requests(
+                app_module.app, specs, args.concurrency, routes
+            )
+            results[backend] = (routes["GET /tenders/"], wall_time)
+    finally:
+        await database_helper.dispose()
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    baseline = None
+    for backend, (stats, wall_time) in results.items():
+        summary = stats.summary(wall_time)
+        baseline = baseline or summary["rps"]
+        print(
+            f"{backend:12} {summary['rps']:8.0f} list rps "
+            f"(x{summary['rps'] / baseline:4.1f})  "
+            f"p50 {summary['p50_ms']:6.2f} ms  p99 {summary['p99_ms']:6.2f} ms  "
+            f"queries/request {summary['queries_per_request']:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
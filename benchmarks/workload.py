@@ -0,0 +1,196 @@
+import json
+import random
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.seed import Dataset
+
+UUID_RE = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+
+
+@dataclass
+class RequestSpec:
+    route: str
+    method: str
+    path: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    json: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def route_label(method: str, path: str) -> str:
+    return f"{method.upper()} {UUID_RE.sub('{id}', path.split('?')[0])}"
+
+
+class DefaultWorkload:
+    """Смесь запросов, близкая к боевой: в основном чтения, немного записей."""
+
+    def __init__(self, dataset: Dataset, prefix: str, rng: random.Random) -> None:
+        self.dataset = dataset
+        self.prefix = prefix
+        self.rng = rng
+        self.counter = 0
+        self.generators: List[Callable[[], RequestSpec]] = []
+        weights: Dict[Callable[[], RequestSpec], int] = {
+            self.tenders_list: 25,
+            self.tenders_deep_page: 5,
+            self.tenders_my: 15,
+            self.tender_status: 15,
+            self.bids_my: 10,
+            self.bids_for_tender: 10,
+            self.tender_create: 5,
+            self.tender_edit: 5,
+            self.bid_decision: 5,
+            self.bid_decision_summary: 5,
+            self.pong: 5,
+        }
+        for generator, weight in weights.items():
+            self.generators.extend([generator] * weight)
+
+    def __iter__(self) -> Iterator[RequestSpec]:
+        while True:
+            yield self.rng.choice(self.generators)()
+
+    def _spec(self, route: str, method: str, path: str, **kwargs) -> RequestSpec:
+        return RequestSpec(
+            route=f"{method} {route}", method=method, path=self.prefix + path, **kwargs
+        )
+
+    def _tender(self):
+        return self.rng.choice(self.dataset.tenders)
+
+    def tenders_list(self) -> RequestSpec:
+        _, _, service_type = self._tender()
+        return self._spec(
+            "/tenders/",
+            "GET",
+            "/tenders/",
+            params={"service_type": service_type, "limit": 10},
+        )
+
+    def tenders_deep_page(self) -> RequestSpec:
+        _, _, service_type = self._tender()
+        offset = self.rng.randrange(max(1, len(self.dataset.tenders) // 4))
+        return self._spec(
+            "/tenders/ (deep offset)",
+            "GET",
+            "/tenders/",
+            params={"service_type": service_type, "limit": 10, "offset": offset},
+        )
+
+    def tenders_my(self) -> RequestSpec:
+        _, creator, _ = self._tender()
+        return self._spec(
+            "/tenders/my", "GET", "/tenders/my", params={"username": creator}
+        )
+
+    def tender_status(self) -> RequestSpec:
+        tender_id, creator, _ = self._tender()
+        return self._spec(
+            "/tenders/{id}/status",
+            "GET",
+            f"/tenders/{tender_id}/status",
+            params={"username": creator},
+        )
+
+    def bids_my(self) -> RequestSpec:
+        username = self.rng.choice(self.dataset.usernames)
+        return self._spec("/bids/my", "GET", "/bids/my", params={"username": username})
+
+    def bids_for_tender(self) -> RequestSpec:
+        tender_id, creator, _ = self._tender()
+        return self._spec(
+            "/bids/{id}/list",
+            "GET",
+            f"/bids/{tender_id}/list",
+            params={"username": creator},
+        )
+
+    def tender_create(self) -> RequestSpec:
+        organization_id = self.rng.choice(list(self.dataset.responsibles))
+        creator = self.rng.choice(self.dataset.responsibles[organization_id])
+        self.counter += 1
+        return self._spec(
+            "/tenders/new",
+            "POST",
+            "/tenders/new",
+            json={
+                "name": f"bench new {self.counter}",
+                "description": "bench",
+                "service_type": "Delivery",
+                "status": "Created",
+                "organization_id": str(organization_id),
+                "creator_username": creator,
+            },
+        )
+
+    def tender_edit(self) -> RequestSpec:
+        tender_id, creator, _ = self._tender()
+        self.counter += 1
+        return self._spec(
+            "/tenders/{id}/edit",
+            "PATCH",
+            f"/tenders/{tender_id}/edit",
+            params={"username": creator},
+            json={"description": f"bench edit {self.counter}"},
+        )
+
+    def bid_decision(self) -> RequestSpec:
+        bid_id, _, organization_id = self.rng.choice(self.dataset.bids)
+        voter = self.rng.choice(self.dataset.responsibles[organization_id])
+        return self._spec(
+            "/bids/{id}/submit_decision",
+            "PUT",
+            f"/bids/{bid_id}/submit_decision",
+            params={"username": voter, "decision": "Approved"},
+        )
+
+    def bid_decision_summary(self) -> RequestSpec:
+        bid_id, _, organization_id = self.rng.choice(self.dataset.bids)
+        voter = self.rng.choice(self.dataset.responsibles[organization_id])
+        return self._spec(
+            "/bids/{id}/decisions/summary",
+            "GET",
+            f"/bids/{bid_id}/decisions/summary",
+            params={"username": voter},
+        )
+
+    def pong(self) -> RequestSpec:
+        return self._spec("/pong", "GET", "/pong")
+
+
+def load_replay(path: Path, prefix: str = "") -> List[RequestSpec]:
+    """
+    Читает журнал запросов JSONL: по объекту на строку с ключами
+    method, path и необязательными params, json, headers, route.
+    """
+    specs = []
+    with open(path, encoding="utf-8") as log:
+        for line in log:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            method = entry.get("method", "GET").upper()
+            route_path = entry["path"]
+            if prefix and route_path.startswith(prefix):
+                route_path = route_path[len(prefix) :]
+            specs.append(
+                RequestSpec(
+                    route=entry.get("route") or route_label(method, route_path),
+                    method=method,
+                    path=prefix + route_path,
+                    params=entry.get("params") or {},
+                    json=entry.get("json"),
+                    headers=entry.get("headers") or {},
+                )
+            )
+    return specs
+
+
+def take(workload, total: Optional[int]) -> List[RequestSpec]:
+    return list(islice(workload, total))
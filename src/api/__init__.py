@@ -1,5 +1,8 @@
 from .bids.views import bids_router
 from .employees.views import employee_router
+from .health.views import health_router
+from .internal.views import internal_router
+from .metrics.views import metrics_router
 from .organization_responsibles.views import organization_responsibles_router
 from .organizations.views import organization_router
 from .pongs.views import pong_router
@@ -8,6 +11,9 @@ from .tenders.views import tenders_router
 __all__ = (
     bids_router,
     employee_router,
+    health_router,
+    internal_router,
+    metrics_router,
     organization_router,
     pong_router,
     tenders_router,
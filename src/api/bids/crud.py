@@ -1,18 +1,32 @@
-from typing import Sequence
-from uuid import UUID
+from typing import Dict, Iterable, Optional, Sequence
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, Select, func, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.bids.dependices import get_bid_by_id, get_decisions
-from api.organization_responsibles.dependices import (
-    get_user_organization_id,
-    user_is_responsible_for_organization,
+from api.bids.dependices import get_decision_tally
+from api.organization_responsibles.dependices import get_responsible_count
+from api.tenders.crud import close_tender
+from api.tenders.dependies import invalidate_tender_pages
+from core.history import State, commit_versioned_update, decode_state, load_versions
+from core.models.business_enums import BidStatus, DecisionType
+from core.models.business_models import (
+    Bid,
+    BidDecisionTally,
+    BidRevision,
+    Decision,
+    Review,
+    bid_search,
 )
-from api.tenders.dependies import get_tender_by_id
-from core.models.business_enums import BidStatus, DecisionType, TenderStatus
-from core.models.business_models import Bid, Decision, OrganizationResponsible, Review
-from core.schemas.bid import BidCreate, BidUpdate
+from core.pagination import Cursor, paginate
+from core.schemas.bid import BidCreate, BidDecisionSummary, BidResponse, BidUpdate
+from core.serialization import RowSerializer
+
+BID_VERSIONED_FIELDS = ("name", "description", "status")
+
+# строки списков: поля BidResponse и updated_at для ETag страницы
+BID_ROWS = RowSerializer(Bid, BidResponse, extra=("updated_at",))
 
 
 async def create_bid(session: AsyncSession, bid: BidCreate):
@@ -20,117 +34,228 @@ async def create_bid(session: AsyncSession, bid: BidCreate):
     session.add(new_tender)
     await session.commit()
     await session.refresh(new_tender)
+    bid_search.index(session, new_tender)
     return new_tender
 
 
 async def get_user_bids(
-    session: AsyncSession, limit: int, offset: int, user_id: UUID
-) -> Sequence[Bid]:
-    stmt = select(Bid).limit(limit).offset(offset).where(Bid.author_id == user_id)
-    result = await session.scalars(stmt)
+    session: AsyncSession,
+    limit: int,
+    offset: int,
+    user_id: UUID,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    stmt = paginate(
+        BID_ROWS.select().where(Bid.author_id == user_id),
+        Bid.name,
+        Bid.id,
+        limit,
+        offset,
+        cursor,
+    )
+    result = await session.execute(stmt)
     return result.all()
 
 
-async def get_bids_list_for_tender(
-    session: AsyncSession, tenderId: UUID, user_id: UUID, limit: int, offset: int
-):
-    stmt = (
-        select(Bid)
-        .filter(Bid.author_id == user_id, Bid.tender_id == tenderId)
-        .offset(offset)
-        .limit(limit)
-        .order_by(Bid.name)
+def tender_bids_page(
+    tenderId: UUID,
+    user_id: UUID,
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    return paginate(
+        BID_ROWS.select().filter(Bid.author_id == user_id, Bid.tender_id == tenderId),
+        Bid.name,
+        Bid.id,
+        limit,
+        offset,
+        cursor,
     )
-    result = await session.scalars(stmt)
+
+
+async def get_bids_list_for_tender(
+    session: AsyncSession,
+    tenderId: UUID,
+    user_id: UUID,
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    stmt = tender_bids_page(tenderId, user_id, limit, offset, cursor)
+    result = await session.execute(stmt)
     return result.all()
 
 
-async def get_bid_status(session: AsyncSession, bid_id: UUID):
-    bid = await get_bid_by_id(session, bid_id)
-    return bid.status.value
+async def search_tender_bids(
+    session: AsyncSession,
+    tenderId: UUID,
+    user_id: UUID,
+    text: str,
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    return await bid_search.search(
+        session,
+        BID_ROWS.columns,
+        text,
+        limit,
+        offset,
+        cursor,
+        where=(Bid.author_id == user_id, Bid.tender_id == tenderId),
+    )
 
 
 async def change_big_status(
-    session: AsyncSession, bid_id: UUID, new_bid_status: BidStatus, user_id: UUID
-) -> Bid:
-    user_organization_id = await get_user_organization_id(session, user_id)
-    stmt = select(Bid).filter(Bid.id == bid_id, Bid.author_id == user_organization_id)
-    result = await session.execute(stmt)
-    bid = result.scalar_one_or_none()
-    bid.status = new_bid_status
-    bid.version += 1
-    await session.commit()
-    await session.refresh(bid)
-    return bid
+    session: AsyncSession, bid: Bid, new_bid_status: BidStatus
+) -> Optional[Bid]:
+    return await _commit_new_version(session, bid, {"status": new_bid_status})
 
 
 async def update_bid(
     session: AsyncSession,
-    bid_id: UUID,
+    bid: Bid,
     bid_update: BidUpdate,
-):
-    bid = await get_bid_by_id(session, bid_id)
-    for name, value in bid_update.model_dump(exclude_unset=True).items():
-        setattr(bid, name, value)
-    bid.version += 1
-    await session.commit()
-    await session.refresh(bid)
-    return bid
+) -> Optional[Bid]:
+    changes = bid_update.model_dump(exclude_unset=True)
+    return await _commit_new_version(session, bid, changes)
 
 
-async def submit_decision(
+async def _commit_new_version(
+    session: AsyncSession, bid: Bid, changes: dict
+) -> Optional[Bid]:
+    # история пишется тем же коммитом, что и правка: один лишний INSERT
+    updated = await commit_versioned_update(
+        session, BidRevision, "bid_id", bid, BID_VERSIONED_FIELDS, changes
+    )
+    if updated is not None:
+        bid_search.index(session, updated)
+    return updated
+
+
+async def get_bid_versions(
+    session: AsyncSession, bid: Bid, versions: Iterable[int]
+) -> Dict[int, State]:
+    return await load_versions(
+        session, BidRevision, BidRevision.bid_id, bid, BID_VERSIONED_FIELDS, versions
+    )
+
+
+async def get_bid_revisions(
     session: AsyncSession,
     bid_id: UUID,
-    decision: DecisionType,
-    user_id: UUID,
-):
-    bid = await get_bid_by_id(session, bid_id)
-
-    responsible_user = await user_is_responsible_for_organization(
-        session, bid.author_id, user_id
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[BidRevision]:
+    stmt = paginate(
+        select(BidRevision).where(BidRevision.bid_id == bid_id),
+        BidRevision.version,
+        BidRevision.id,
+        limit,
+        offset,
+        cursor,
     )
-    if not responsible_user:
-        return
+    result = await session.scalars(stmt)
+    return result.all()
 
-    new_decision = Decision(bid_id=bid.id, user_id=user_id, decision_type=decision)
-    session.add(new_decision)
-    await session.commit()
 
-    decisions = await get_decisions(session, bid_id)
+async def rollback_bid(session: AsyncSession, bid: Bid, state: State) -> Optional[Bid]:
+    """Делает восстановленное состояние версии новой текущей версией."""
+    return await _commit_new_version(session, bid, decode_state(Bid, state))
 
-    if any(d.decision_type == DecisionType.REJECTED for d in decisions):
-        return {"STATUS": "REJECTED"}
 
-    approvals_count = sum(
-        1 for decision in decisions if decision.decision_type == DecisionType.APPROVED
-    )
+def quorum_reached(approved: int, rejected: int, quorum_target: int) -> bool:
+    return not rejected and approved >= quorum_target
 
-    organization_id = bid.author_id
-    stmt = select(func.count(OrganizationResponsible)).filter(
-        OrganizationResponsible.organization_id == organization_id
+
+def _upsert(session: AsyncSession):
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+async def increment_decision_tally(
+    session: AsyncSession, bid_id: UUID, decision: DecisionType, quorum_target: int
+):
+    """
+    Прибавляет голос к счетчикам предложения одним INSERT ... ON CONFLICT.
+    Конфликтующая строка блокируется до конца транзакции, поэтому голоса
+    по одному предложению выстраиваются в очередь и видят итог предыдущих.
+    """
+    approved = int(decision == DecisionType.APPROVED)
+    stmt = _upsert(session)(BidDecisionTally).values(
+        id=uuid4(),
+        bid_id=bid_id,
+        approved_count=approved,
+        rejected_count=1 - approved,
+        quorum_target=quorum_target,
     )
-    total_responsible_users = await session.scalars(stmt)
-    quorum = min(3, total_responsible_users.first())
-    is_approved = approvals_count >= quorum
-    if is_approved:
-        tender = await get_tender_by_id(session, bid.tender_id)
-        tender.status = TenderStatus.CLOSED
-        await session.commit()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[BidDecisionTally.bid_id],
+        set_={
+            "approved_count": BidDecisionTally.approved_count
+            + stmt.excluded.approved_count,
+            "rejected_count": BidDecisionTally.rejected_count
+            + stmt.excluded.rejected_count,
+            "quorum_target": stmt.excluded.quorum_target,
+            "updated_at": func.now(),
+        },
+    ).returning(
+        BidDecisionTally.approved_count,
+        BidDecisionTally.rejected_count,
+        BidDecisionTally.quorum_target,
+    )
+    return (await session.execute(stmt)).one()
+
+
+async def submit_decision(
+    session: AsyncSession,
+    bid: Bid,
+    decision: DecisionType,
+    user_id: UUID,
+) -> Bid:
+    """Пишет решение, обновляет счетчики и закрывает тендер в одной транзакции."""
+    session.add(Decision(bid_id=bid.id, user_id=user_id, decision_type=decision))
+    await session.flush()
+
+    quorum_target = min(3, await get_responsible_count(session, bid.author_id))
+    tally = await increment_decision_tally(session, bid.id, decision, quorum_target)
+    closed = None
+    if quorum_reached(*tally):
+        closed = await close_tender(session, bid.tender_id)
+    await session.commit()
+    if closed is not None:
+        # статус виден в списках тендеров и их счетчиках
+        await invalidate_tender_pages(closed.service_type)
     return bid
 
 
+async def get_decision_summary(session: AsyncSession, bid: Bid) -> BidDecisionSummary:
+    tally = await get_decision_tally(session, bid.id)
+    if tally is None:
+        quorum_target = min(3, await get_responsible_count(session, bid.author_id))
+        return BidDecisionSummary(
+            bid_id=bid.id, quorum_target=quorum_target, quorum_reached=False
+        )
+    return BidDecisionSummary(
+        bid_id=bid.id,
+        approved_count=tally.approved_count,
+        rejected_count=tally.rejected_count,
+        quorum_target=tally.quorum_target,
+        quorum_reached=quorum_reached(
+            tally.approved_count, tally.rejected_count, tally.quorum_target
+        ),
+    )
+
+
 async def send_feedback(
     session: AsyncSession,
-    bid_id: UUID,
+    bid: Bid,
     description: str,
     user_id: UUID,
 ):
-    bid = await get_bid_by_id(session, bid_id)
-    responsible_user = await user_is_responsible_for_organization(
-        session, bid.author_id, user_id
-    )
-    if not responsible_user:
-        return "ERROR"
-    new_review = Review(description=description, bid_id=bid_id, reviewer_id=user_id)
+    new_review = Review(description=description, bid_id=bid.id, reviewer_id=user_id)
     session.add(new_review)
     await session.commit()
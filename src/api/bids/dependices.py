@@ -1,31 +1,99 @@
+from typing import NamedTuple, Optional, Type
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.etag import if_match_satisfied, resource_etag
 from core.models.business_enums import AuthorType
-from core.models.business_models import Bid, Decision, OrganizationResponsible
+from core.models.business_models import (
+    Bid,
+    BidDecisionTally,
+    Employee,
+    OrganizationResponsible,
+)
+from error_response_models import (
+    BaseErrorResponse,
+    BidNotExistErrorResponse,
+    PreconditionFailedErrorResponse,
+    UserIsNotResponsibleForBidErrorResponse,
+    UserNotExistErrorResponse,
+)
 
 
-async def get_user_bids_responsible(session: AsyncSession, bid_id: UUID, user_id: UUID):
-    stmt = (
-        select(Bid)
-        .filter(Bid.author_type == AuthorType.ORGANIZATION)
-        .join(
-            OrganizationResponsible,
-            Bid.author_id == OrganizationResponsible.organization_id,
+class BidAccess(NamedTuple):
+    user: Optional[Employee]
+    bid: Optional[Bid]
+    is_organization_responsible: bool = False
+
+    @property
+    def is_author(self) -> bool:
+        return self.bid.author_type == AuthorType.USER and (
+            self.bid.author_id == self.user.id
         )
-    )
-    # stmt = select(Bid).filter(Bid.id == bid_id, Bid.author_type == AuthorType.USER, Bid.author_id == user_id)
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
 
+    @property
+    def is_responsible(self) -> bool:
+        return self.is_author or self.is_organization_responsible
+
+    def error_response(
+        self,
+        forbidden: Type[BaseErrorResponse] = UserIsNotResponsibleForBidErrorResponse,
+        organization_only: bool = False,
+    ) -> Optional[BaseErrorResponse]:
+        if self.user is None:
+            return UserNotExistErrorResponse()  # 401
+        # 404 раньше 403: ответственность за несуществующее предложение не проверить
+        if self.bid is None:
+            return BidNotExistErrorResponse()  # 404
+        allowed = (
+            self.is_organization_responsible
+            if organization_only
+            else self.is_responsible
+        )
+        if not allowed:
+            return forbidden()  # 403
+        return None
+
+    def precondition_response(
+        self, if_match: Optional[str], **kwargs
+    ) -> Optional[BaseErrorResponse]:
+        """error_response плюс проверка If-Match по текущей версии предложения."""
+        if error := self.error_response(**kwargs):
+            return error
+        if not if_match_satisfied(if_match, resource_etag(self.bid)):
+            return PreconditionFailedErrorResponse()  # 412
+        return None
 
-async def get_bid_by_id(session: AsyncSession, bid_id: UUID):
-    return await session.get(Bid, bid_id)
+
+async def resolve_bid_access(
+    session: AsyncSession, bid_id: UUID, username: str
+) -> BidAccess:
+    """
+    Пользователь, предложение и признак ответственности за организацию-автора
+    одним запросом вместо трех последовательных.
+    """
+    is_organization_responsible = exists().where(
+        OrganizationResponsible.organization_id == Bid.author_id,
+        OrganizationResponsible.user_id == Employee.id,
+    )
+    stmt = (
+        select(Employee, Bid, is_organization_responsible.label("is_responsible"))
+        .outerjoin(Bid, Bid.id == bid_id)
+        .where(Employee.username == username)
+    )
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        return BidAccess(user=None, bid=None)
+    return BidAccess(
+        user=row.Employee,
+        bid=row.Bid,
+        is_organization_responsible=bool(row.is_responsible),
+    )
 
 
-async def get_decisions(session: AsyncSession, bid_id: UUID):
-    stmt = select(Decision).filter(Decision.bid_id == bid_id)
-    result = await session.execute(stmt)
-    return result.all()
+async def get_decision_tally(
+    session: AsyncSession, bid_id: UUID
+) -> Optional[BidDecisionTally]:
+    stmt = select(BidDecisionTally).where(BidDecisionTally.bid_id == bid_id)
+    return await session.scalar(stmt)
@@ -1,28 +1,52 @@
 import logging
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.employees.dependices import get_user_by_id, get_user_by_username
 from api.organizations.dependices import get_organization_by_id
 from api.tenders.dependies import get_tender_by_id
+from core.etag import (
+    IfMatch,
+    IfNoneMatch,
+    if_none_match_satisfied,
+    not_modified,
+    page_etag,
+    resource_etag,
+    set_etag,
+    versioned_response,
+)
 from core.models.business_enums import BidStatus, DecisionType
 from core.models.db_helper import database_helper
-from core.schemas.bid import AuthorType, BidCreate, BidResponse, BidUpdate
+from core.pagination import (
+    Cursor,
+    name_cursor_query,
+    set_next_page_headers,
+    version_cursor_query,
+)
+from core.schemas.bid import (
+    AuthorType,
+    BidCreate,
+    BidDecisionSummary,
+    BidResponse,
+    BidUpdate,
+)
+from core.schemas.history import RevisionResponse, VersionDiff
+from core.search import rank_cursor_query
+from core.serialization import page_response
 from error_response_models import (
-    BidNotExistErrorResponse,
     ForbiddenErrorResponse,
     OrganizationNotExistErrorResponse,
     TenderNotExistErrorResponse,
-    UserIsNotResponsibleForBidErrorResponse,
     UserNotExistErrorResponse,
+    VersionNotExistErrorResponse,
 )
 
 from . import crud
-from .dependices import get_bid_by_id, get_user_bids_responsible
+from .dependices import resolve_bid_access
 
 bids_router = APIRouter(prefix="/bids", tags=["bids"])
 
@@ -35,18 +59,25 @@ logger = logging.getLogger(__name__)
 async def create_new_bid(
     session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
     bid: BidCreate,
+    response: Response,
 ):
     if not await get_tender_by_id(session, bid.tender_id):
         return TenderNotExistErrorResponse()
-    if bid.author_type == AuthorType.USER and not await get_user_by_id(
-        session, bid.author_id
-    ):
-        return UserNotExistErrorResponse()
+    author = None
+    if bid.author_type == AuthorType.USER:
+        author = await get_user_by_id(session, bid.author_id)
+        if not author:
+            return UserNotExistErrorResponse()
     if bid.author_type == AuthorType.ORGANIZATION and not await get_organization_by_id(
         session, bid.author_id
     ):
         return OrganizationNotExistErrorResponse()
-    return await crud.create_bid(session, bid)
+    new_bid = await crud.create_bid(session, bid)
+    # у предложения от организации нет одного автора с username
+    if author is not None:
+        database_helper.mark_write(author.username)
+    set_etag(response, new_bid)
+    return new_bid
 
 
 @bids_router.get(
@@ -55,7 +86,9 @@ async def create_new_bid(
     response_model=List[BidResponse],
 )
 async def get_user_bids(
-    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    request: Request,
+    cursor: Annotated[Optional[Cursor], Depends(name_cursor_query)],
     limit: int = Query(default=5, ge=0),
     offset: int = Query(default=0, ge=0),
     username: str = Query(default="test_user"),
@@ -63,7 +96,8 @@ async def get_user_bids(
     user = await get_user_by_username(session, username)
     if not user:
         return UserNotExistErrorResponse()
-    return await crud.get_user_bids(session, limit, offset, user.id)
+    bids = await crud.get_user_bids(session, limit, offset, user.id, cursor)
+    return page_response(request, crud.BID_ROWS, bids, limit)
 
 
 @bids_router.get(
@@ -71,8 +105,42 @@ async def get_user_bids(
     description="Получение списка предложений для тендера",
 )
 async def get_list_bids_for_tender(
-    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    tender_id: Annotated[UUID, Path(..., alias="tenderId")],
+    request: Request,
+    cursor: Annotated[Optional[Cursor], Depends(name_cursor_query)],
+    username: str = Query(default="test_user"),
+    limit: int = Query(default=5, ge=0),
+    offset: int = Query(default=0, ge=0),
+    if_none_match: IfNoneMatch = None,
+):
+    user = await get_user_by_username(session, username)
+    if not user:
+        return UserNotExistErrorResponse()  # 401
+    if not await get_tender_by_id(session, tender_id):
+        return TenderNotExistErrorResponse()  # 404
+    if if_none_match is not None:
+        page = crud.tender_bids_page(tender_id, user.id, limit, offset, cursor)
+        etag = await page_etag(session, page)
+        if if_none_match_satisfied(if_none_match, etag):
+            return not_modified(etag)
+    bids = await crud.get_bids_list_for_tender(
+        session, tender_id, user.id, limit, offset, cursor
+    )
+    return page_response(request, crud.BID_ROWS, bids, limit)
+
+
+@bids_router.get(
+    "/{tenderId}/search",
+    description="Поиск своих предложений по тендеру по названию и описанию",
+    response_model=List[BidResponse],
+)
+async def search_bids_for_tender(
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
     tender_id: Annotated[UUID, Path(..., alias="tenderId")],
+    request: Request,
+    cursor: Annotated[Optional[Cursor], Depends(rank_cursor_query)],
+    q: str = Query(min_length=1, max_length=200, description="Слова или их начала"),
     username: str = Query(default="test_user"),
     limit: int = Query(default=5, ge=0),
     offset: int = Query(default=0, ge=0),
@@ -82,34 +150,36 @@ async def get_list_bids_for_tender(
         return UserNotExistErrorResponse()  # 401
     if not await get_tender_by_id(session, tender_id):
         return TenderNotExistErrorResponse()  # 404
-    return await crud.get_bids_list_for_tender(
-        session, tender_id, user.id, limit, offset
+    bids = await crud.search_tender_bids(
+        session, tender_id, user.id, q, limit, offset, cursor
     )
+    return page_response(request, crud.BID_ROWS, bids, limit, key_attr="rank")
 
 
 @bids_router.get(
-    "{bidId}/status",
+    "/{bidId}/status",
     description="Получение статуса предложения",
     response_model=BidResponse,
 )
 async def get_bid_status(
-    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
     bid_id: Annotated[UUID, Path(..., alias="bidId")],
     username: str = Query(default="test_user"),
+    if_none_match: IfNoneMatch = None,
 ):
-    user = await get_user_by_username(session, username)
-    if not user:
-        return UserNotExistErrorResponse()  # 401
-    if not await get_user_bids_responsible(session, bid_id, user.id):
-        return ForbiddenErrorResponse()  # 403
-    if not await get_bid_by_id(session, bid_id):
-        return BidNotExistErrorResponse()  # 404
-    bid_status = await crud.get_bid_status(session, bid_id)
-    return JSONResponse(status_code=200, content=bid_status)
+    access = await resolve_bid_access(session, bid_id, username)
+    if error := access.error_response(forbidden=ForbiddenErrorResponse):
+        return error
+    etag = resource_etag(access.bid)
+    if if_none_match_satisfied(if_none_match, etag):
+        return not_modified(etag)
+    return JSONResponse(
+        status_code=200, content=access.bid.status.value, headers={"ETag": etag}
+    )
 
 
 @bids_router.put(
-    "{bidId}/status",
+    "/{bidId}/status",
     description="Изменение статуса предложения",
     response_model=BidResponse,
 )
@@ -117,16 +187,15 @@ async def change_bid_status(
     session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
     bid_id: Annotated[UUID, Path(..., alias="bidId")],
     new_bid_status: BidStatus,
+    response: Response,
     username: str = Query(default="test_user"),
+    if_match: IfMatch = None,
 ):
-    user = await get_user_by_username(session, username)
-    if not user:
-        return UserNotExistErrorResponse()  # 401
-    if not await get_user_bids_responsible(session, bid_id, user.username):
-        return UserIsNotResponsibleForBidErrorResponse()  # 403
-    if not await get_bid_by_id(session, bid_id):
-        return BidNotExistErrorResponse()  # 404
-    return await crud.change_big_status(session, bid_id, new_bid_status, user.id)
+    access = await resolve_bid_access(session, bid_id, username)
+    if error := access.precondition_response(if_match):
+        return error
+    bid = await crud.change_big_status(session, access.bid, new_bid_status)
+    return versioned_response(response, bid)
 
 
 @bids_router.patch(
@@ -138,16 +207,85 @@ async def edit_bit_data(
     session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
     bid_id: Annotated[UUID, Path(..., alias="bidId")],
     bid_update: BidUpdate,
+    response: Response,
     username: str = Query(default="test_user"),
+    if_match: IfMatch = None,
 ):
-    user = await get_user_by_username(session, username)
-    if not user:
-        return UserNotExistErrorResponse()  # 401
-    if not await get_user_bids_responsible(session, bid_id, user.username):
-        return UserIsNotResponsibleForBidErrorResponse()  # 403
-    if not await get_bid_by_id(session, bid_id):
-        return BidNotExistErrorResponse()  # 404
-    return await crud.update_bid(session, bid_id, bid_update)
+    access = await resolve_bid_access(session, bid_id, username)
+    if error := access.precondition_response(if_match):
+        return error
+    bid = await crud.update_bid(session, access.bid, bid_update)
+    return versioned_response(response, bid)
+
+
+@bids_router.put(
+    "/{bidId}/rollback/{version}",
+    description="Откат версии предложения",
+    response_model=BidResponse,
+)
+async def rollback_bid_to_version(
+    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    bid_id: Annotated[UUID, Path(..., alias="bidId")],
+    version: Annotated[int, Path(..., ge=1)],
+    response: Response,
+    username: str = Query(default="test_user"),
+    if_match: IfMatch = None,
+):
+    access = await resolve_bid_access(session, bid_id, username)
+    if error := access.precondition_response(if_match):
+        return error
+    states = await crud.get_bid_versions(session, access.bid, [version])
+    if version not in states:
+        return VersionNotExistErrorResponse()
+    bid = await crud.rollback_bid(session, access.bid, states[version])
+    return versioned_response(response, bid)
+
+
+@bids_router.get(
+    "/{bidId}/versions",
+    description="Прошлые версии предложения, от старых к новым",
+    response_model=List[RevisionResponse],
+)
+async def get_bid_versions(
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    bid_id: Annotated[UUID, Path(..., alias="bidId")],
+    request: Request,
+    response: Response,
+    cursor: Annotated[Optional[Cursor], Depends(version_cursor_query)],
+    username: str = Query(default="test_user"),
+    limit: int = Query(default=5, ge=0),
+    offset: int = Query(default=0, ge=0),
+):
+    access = await resolve_bid_access(session, bid_id, username)
+    if error := access.error_response():
+        return error
+    revisions = await crud.get_bid_revisions(session, bid_id, limit, offset, cursor)
+    return set_next_page_headers(request, response, revisions, "version", limit)
+
+
+@bids_router.get(
+    "/{bidId}/diff",
+    description="Изменения полей предложения между двумя версиями",
+    response_model=VersionDiff,
+)
+async def diff_bid_versions(
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    bid_id: Annotated[UUID, Path(..., alias="bidId")],
+    from_version: Annotated[int, Query(..., alias="from", ge=1)],
+    to_version: Annotated[int, Query(..., alias="to", ge=1)],
+    username: str = Query(default="test_user"),
+):
+    access = await resolve_bid_access(session, bid_id, username)
+    if error := access.error_response():
+        return error
+    states = await crud.get_bid_versions(
+        session, access.bid, [from_version, to_version]
+    )
+    if from_version not in states or to_version not in states:
+        return VersionNotExistErrorResponse()
+    return VersionDiff.between(
+        from_version, states[from_version], to_version, states[to_version]
+    )
 
 
 @bids_router.put(
@@ -161,14 +299,26 @@ async def submit_bid_decision(
     decision: DecisionType,
     username: str = Query(default="test_user"),
 ):
-    user = await get_user_by_username(session, username)
-    if not user:
-        return UserNotExistErrorResponse()  # 401
-    if not await get_user_bids_responsible(session, bid_id, user.username):
-        return UserIsNotResponsibleForBidErrorResponse()  # 403
-    if not await get_bid_by_id(session, bid_id):
-        return BidNotExistErrorResponse()  # 404
-    await crud.submit_decision(session, bid_id, decision, user.id)
+    access = await resolve_bid_access(session, bid_id, username)
+    if error := access.error_response(organization_only=True):
+        return error
+    return await crud.submit_decision(session, access.bid, decision, access.user.id)
+
+
+@bids_router.get(
+    "/{bidId}/decisions/summary",
+    description="Итоги голосования по предложению",
+    response_model=BidDecisionSummary,
+)
+async def get_bid_decision_summary(
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    bid_id: Annotated[UUID, Path(..., alias="bidId")],
+    username: str = Query(default="test_user"),
+):
+    access = await resolve_bid_access(session, bid_id, username)
+    if error := access.error_response(organization_only=True):
+        return error
+    return await crud.get_decision_summary(session, access.bid)
 
 
 @bids_router.put("/{bidId}/feedback", description="Отправка отзыва по предложению")
@@ -178,7 +328,7 @@ async def send_bid_feedback(
     bid_feedback: Annotated[str, Query(..., alias="bidFeedback")],
     username: str = Query(default="test_user"),
 ):
-    user = await get_user_by_username(session, username)
-    if not user:
-        return UserNotExistErrorResponse()  # 401
-    await crud.send_feedback(session, bid_id, bid_feedback, user.id)
+    access = await resolve_bid_access(session, bid_id, username)
+    if error := access.error_response(organization_only=True):
+        return error
+    await crud.send_feedback(session, access.bid, bid_feedback, access.user.id)
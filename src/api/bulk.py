@@ -0,0 +1,149 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Tuple, Type
+
+import orjson
+from fastapi import Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import consts
+from core.config import settings
+from core.schemas.bulk import BulkImportResult, BulkRowError
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+BULK_DESCRIPTION = (
+    "Тело - JSON-массив или поток NDJSON (Content-Type: application/x-ndjson). "
+    "Строки вставляются пачками, ошибки возвращаются построчно по индексу."
+)
+
+Batch = List[Tuple[int, BaseModel]]
+BatchHandler = Callable[
+    [AsyncSession, Batch], Awaitable[Tuple[int, List[BulkRowError]]]
+]
+
+
+class InvalidBulkBodyError(ValueError):
+    pass
+
+
+def _is_ndjson(request: Request) -> bool:
+    content_type = request.headers.get("content-type", "")
+    return content_type.split(";")[0].strip() in NDJSON_MEDIA_TYPES
+
+
+async def _iter_ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    tail = b""
+    async for chunk in request.stream():
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line
+    yield tail
+
+
+async def iter_request_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Отдает (индекс, объект) из JSON-массива или NDJSON-потока.
+    Битая строка NDJSON отдается как исключение на своем индексе.
+    """
+    if _is_ndjson(request):
+        index = 0
+        async for line in _iter_ndjson_lines(request):
+            if not line.strip():
+                continue
+            try:
+                yield index, orjson.loads(line)
+            except orjson.JSONDecodeError as exc:
+                yield index, exc
+            index += 1
+        return
+
+    try:
+        items = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as exc:
+        raise InvalidBulkBodyError(str(exc)) from exc
+    if not isinstance(items, list):
+        raise InvalidBulkBodyError("Ожидается JSON-массив")
+    for index, item in enumerate(items):
+        yield index, item
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()
+    )
+
+
+async def bulk_import(
+    session: AsyncSession,
+    request: Request,
+    schema: Type[BaseModel],
+    handle_batch: BatchHandler,
+) -> BulkImportResult:
+    result = BulkImportResult()
+    batch: Batch = []
+
+    async def flush():
+        inserted, errors = await handle_batch(session, batch)
+        result.inserted += inserted
+        result.errors.extend(errors)
+        batch.clear()
+
+    async for index, item in iter_request_items(request):
+        if isinstance(item, Exception):
+            result.errors.append(BulkRowError(index=index, reason=str(item)))
+            continue
+        try:
+            batch.append((index, schema.model_validate(item)))
+        except ValidationError as exc:
+            reason = format_validation_error(exc)
+            result.errors.append(BulkRowError(index=index, reason=reason))
+            continue
+        if len(batch) >= settings.bulk.batch_size:
+            await flush()
+    if batch:
+        await flush()
+    result.errors.sort(key=lambda error: error.index)
+    return result
+
+
+def _conflict_reason(exc: IntegrityError) -> str:
+    # первая строка сообщения базы называет нарушенное ограничение
+    lines = str(exc.orig).strip().splitlines()
+    if not lines:
+        return consts.BULK_ROW_CONFLICT_CONTENT
+    return f"{consts.BULK_ROW_CONFLICT_CONTENT}: {lines[0]}"
+
+
+async def insert_rows(
+    session: AsyncSession, model: Type, rows: List[Tuple[int, dict]]
+) -> Tuple[int, List[BulkRowError]]:
+    """
+    Пишет пачку одним многострочным INSERT и коммитит ее. Если пачка
+    упирается в ограничение базы, она повторяется по строке, чтобы
+    записать остальные и назвать в ошибках именно конфликтные строки.
+    """
+    if not rows:
+        return 0, []
+    try:
+        await session.execute(insert(model), [row for _, row in rows])
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+    else:
+        return len(rows), []
+
+    # редкий путь: по транзакции на строку, SAVEPOINT в SQLite-драйвере ненадежен
+    inserted, errors = 0, []
+    for index, row in rows:
+        try:
+            await session.execute(insert(model), [row])
+            await session.commit()
+        except IntegrityError as exc:
+            await session.rollback()
+            errors.append(BulkRowError(index=index, reason=_conflict_reason(exc)))
+        else:
+            inserted += 1
+    return inserted, errors
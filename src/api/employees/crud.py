@@ -0,0 +1,33 @@
+from typing import List, Set, Tuple
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import consts
+from api.bulk import Batch, insert_rows
+from api.employees.dependices import employee_cache
+from core.models.business_models import Employee
+from core.schemas.bulk import BulkRowError
+
+
+async def create_employees_batch(
+    session: AsyncSession, batch: Batch, seen_usernames: Set[str]
+) -> Tuple[int, List[BulkRowError]]:
+    usernames = [employee.username for _, employee in batch]
+    stmt = select(Employee.username).where(Employee.username.in_(usernames))
+    existing = set((await session.scalars(stmt)).all())
+
+    errors, rows = [], []
+    for index, employee in batch:
+        if employee.username in existing or employee.username in seen_usernames:
+            reason = consts.DUPLICATE_USERNAME_CONTENT
+            errors.append(BulkRowError(index=index, reason=reason))
+            continue
+        seen_usernames.add(employee.username)
+        rows.append((index, {"id": uuid4(), **employee.model_dump()}))
+
+    inserted, insert_errors = await insert_rows(session, Employee, rows)
+    if inserted:
+        employee_cache.invalidate(*(("username", row["username"]) for _, row in rows))
+    return inserted, errors + insert_errors
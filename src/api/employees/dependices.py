@@ -4,17 +4,45 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import TTLCache
+from core.config import settings
 from core.models.business_models import Employee
+from core.schemas.employee import Employee as EmployeeSchema
 
+# Кэш личности пользователя: ключи ("id", uuid) и ("username", str).
+# Хранятся неизменяемые схемы, а не ORM-объекты чужой сессии.
+# Сброс при создании виден только своему воркеру, поэтому отсутствие
+# пользователя помнится недолго: новый пользователь не получает 401.
+employee_cache = TTLCache(
+    maxsize=settings.cache.identity_maxsize,
+    ttl=settings.cache.identity_ttl,
+    negative_ttl=settings.cache.identity_negative_ttl,
+)
 
-async def get_user_by_id(session: AsyncSession, user_id: UUID) -> Optional[Employee]:
-    employee = await session.get(Employee, user_id)
-    return employee
+
+def _to_schema(employee: Optional[Employee]) -> Optional[EmployeeSchema]:
+    return EmployeeSchema.model_validate(employee) if employee else None
+
+
+def invalidate_employee_cache(employee: Employee) -> None:
+    employee_cache.invalidate(("id", employee.id), ("username", employee.username))
+
+
+async def get_user_by_id(
+    session: AsyncSession, user_id: UUID
+) -> Optional[EmployeeSchema]:
+    async def load():
+        return _to_schema(await session.get(Employee, user_id))
+
+    return await employee_cache.get_or_load(("id", user_id), load)
 
 
 async def get_user_by_username(
     session: AsyncSession, username: str
-) -> Optional[Employee]:
-    stmt = select(Employee).where(Employee.username == username)
-    result_user = await session.execute(stmt)
-    return result_user.scalar_one_or_none()
+) -> Optional[EmployeeSchema]:
+    async def load():
+        stmt = select(Employee).where(Employee.username == username)
+        result_user = await session.execute(stmt)
+        return _to_schema(result_user.scalar_one_or_none())
+
+    return await employee_cache.get_or_load(("username", username), load)
@@ -1,12 +1,18 @@
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.bulk import BULK_DESCRIPTION, InvalidBulkBodyError, bulk_import
+from api.employees.crud import create_employees_batch
+from api.employees.dependices import invalidate_employee_cache
 from core.models.business_models import Employee
 from core.models.db_helper import database_helper
+from core.schemas.bulk import BulkImportResult
 from core.schemas.employee import EmployeeCreate
+from error_response_models import BadRequestErrorResponse
 
 employee_router = APIRouter(prefix="/employees", tags=["employees"])
 
@@ -35,4 +41,22 @@ async def create_new_employee(
     session.add(new_employee)
     await session.commit()
     await session.refresh(new_employee)
+    invalidate_employee_cache(new_employee)
     return {"message": "employee created successfully", "employee": new_employee}
+
+
+@employee_router.post(
+    "/bulk",
+    description=f"Массовое создание пользователей. {BULK_DESCRIPTION}",
+    response_model=BulkImportResult,
+    status_code=200,
+)
+async def create_employees_bulk(
+    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    request: Request,
+):
+    handle_batch = partial(create_employees_batch, seen_usernames=set())
+    try:
+        return await bulk_import(session, request, EmployeeCreate, handle_batch)
+    except InvalidBulkBodyError as exc:
+        return BadRequestErrorResponse(content=str(exc))
@@ -0,0 +1,33 @@
+from typing import AsyncIterator
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from core.config import settings
+from core.models.db_helper import database_helper
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def _iter_ndjson_chunks(stmt: Select) -> AsyncIterator[bytes]:
+    # Сессия открывается внутри генератора: зависимость session_getter
+    # закрывается до того, как StreamingResponse начнет отдавать тело.
+    async with database_helper.read_session_factory()() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=settings.export.chunk_rows)
+        )
+        async for rows in result.mappings().partitions():
+            yield b"".join(orjson.dumps(dict(row)) + b"\n" for row in rows)
+
+
+def ndjson_export(stmt: Select, filename: str) -> StreamingResponse:
+    """
+    Выгрузка таблицы построчно в NDJSON через серверный курсор.
+    Память не зависит от числа строк, ORM-объекты не создаются.
+    """
+    return StreamingResponse(
+        _iter_ndjson_chunks(stmt),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'},
+    )
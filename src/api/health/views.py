@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from core.health import readiness_probe
+
+health_router = APIRouter(prefix="/health", tags=["health"])
+
+
+@health_router.get("/live", description="Процесс жив и event loop отвечает")
+async def liveness():
+    return PlainTextResponse("ok")
+
+
+@health_router.get(
+    "/ready",
+    description="Готовность принимать трафик: база, пул и схема; иначе 503",
+)
+async def readiness():
+    report = await readiness_probe.check()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
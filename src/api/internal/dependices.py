@@ -0,0 +1,26 @@
+import secrets
+from typing import Optional
+
+from fastapi import Header
+
+from core.config import settings
+
+
+class InternalAccessDenied(Exception):
+    pass
+
+
+async def require_internal_token(
+    x_internal_token: Optional[str] = Header(default=None),
+) -> None:
+    """
+    Доступ к /internal/*: выгрузки всех таблиц и состояние воркера.
+    Без INTERNAL.token маршруты закрыты для всех.
+    """
+    expected = settings.internal.token
+    if (
+        expected is None
+        or x_internal_token is None
+        or not secrets.compare_digest(x_internal_token, expected)
+    ):
+        raise InternalAccessDenied
@@ -0,0 +1,78 @@
+from typing import Annotated, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+
+from api.employees.dependices import employee_cache
+from api.export import ndjson_export
+from api.internal.dependices import require_internal_token
+from api.organization_responsibles.dependices import membership_cache
+from api.tenders.dependies import tender_pages_cache
+from core.models.business_enums import ServiceType
+from core.models.business_models import Bid, Employee, Organization, Tender
+from core.models.db_helper import database_helper
+from core.models.pool import pool_status
+from core.query_stats import route_query_metrics
+
+internal_router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(require_internal_token)],
+)
+
+
+@internal_router.get("/pool", description="Состояние пула соединений воркера")
+async def get_pool_status():
+    return {
+        "primary": pool_status(database_helper.engine),
+        "replicas": [pool_status(engine) for engine in database_helper.replica_engines],
+    }
+
+
+@internal_router.get("/caches", description="Счетчики кэшей воркера")
+async def get_caches_status():
+    return {
+        "employee": employee_cache.stats(),
+        "organization_membership": membership_cache.stats(),
+        "tender_pages": tender_pages_cache.stats(),
+    }
+
+
+@internal_router.get(
+    "/queries", description="Число SQL-запросов и время в базе по маршрутам воркера"
+)
+async def get_query_stats():
+    return route_query_metrics.snapshot()
+
+
+# Выгрузки отдают таблицы целиком, без проверки пользователя, поэтому
+# доступны только на внутреннем роутере, по X-Internal-Token.
+@internal_router.get("/export/tenders", description="Выгрузка тендеров в NDJSON")
+async def export_tenders(service_type: Optional[ServiceType] = Query(default=None)):
+    stmt = select(Tender.__table__)
+    if service_type is not None:
+        stmt = stmt.where(Tender.service_type == service_type)
+    return ndjson_export(stmt, "tenders")
+
+
+@internal_router.get("/export/bids", description="Выгрузка предложений в NDJSON")
+async def export_bids(
+    tender_id: Annotated[Optional[UUID], Query(alias="tenderId")] = None,
+):
+    stmt = select(Bid.__table__)
+    if tender_id is not None:
+        stmt = stmt.where(Bid.tender_id == tender_id)
+    return ndjson_export(stmt, "bids")
+
+
+@internal_router.get("/export/employees", description="Выгрузка пользователей в NDJSON")
+async def export_employees():
+    return ndjson_export(select(Employee.__table__), "employees")
+
+
+@internal_router.get(
+    "/export/organizations", description="Выгрузка организаций в NDJSON"
+)
+async def export_organizations():
+    return ndjson_export(select(Organization.__table__), "organizations")
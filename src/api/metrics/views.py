@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.prometheus import metrics_exporter
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    "/metrics",
+    description="Метрики в текстовом формате Prometheus",
+    include_in_schema=False,
+)
+async def get_metrics():
+    return PlainTextResponse(
+        metrics_exporter.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,46 @@
+from typing import List, Tuple
+from uuid import uuid4
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import consts
+from api.bulk import Batch, insert_rows
+from api.organization_responsibles.dependices import (
+    invalidate_organization_membership,
+)
+from core.models.business_models import Employee, Organization, OrganizationResponsible
+from core.schemas.bulk import BulkRowError
+
+
+async def create_organization_responsibles_batch(
+    session: AsyncSession, batch: Batch
+) -> Tuple[int, List[BulkRowError]]:
+    organization_ids = {responsible.organization_id for _, responsible in batch}
+    user_ids = {responsible.user_id for _, responsible in batch}
+    # Проверка внешних ключей всей пачки одним запросом
+    stmt = union_all(
+        select(literal("organization").label("kind"), Organization.id).where(
+            Organization.id.in_(organization_ids)
+        ),
+        select(literal("employee").label("kind"), Employee.id).where(
+            Employee.id.in_(user_ids)
+        ),
+    )
+    found = {(kind, row_id) for kind, row_id in await session.execute(stmt)}
+
+    errors, rows = [], []
+    for index, responsible in batch:
+        if ("organization", responsible.organization_id) not in found:
+            reason = consts.ORGANIZATION_NOT_FOUND_CONTENT
+            errors.append(BulkRowError(index=index, reason=reason))
+        elif ("employee", responsible.user_id) not in found:
+            reason = consts.USER_NOT_FOUND_CONTENT
+            errors.append(BulkRowError(index=index, reason=reason))
+        else:
+            rows.append((index, {"id": uuid4(), **responsible.model_dump()}))
+
+    inserted, insert_errors = await insert_rows(session, OrganizationResponsible, rows)
+    if inserted:
+        invalidate_organization_membership(*{row["organization_id"] for _, row in rows})
+    return inserted, errors + insert_errors
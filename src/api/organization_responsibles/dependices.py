@@ -1,25 +1,61 @@
+from typing import FrozenSet
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import TTLCache
+from core.config import settings
 from core.models.business_models import OrganizationResponsible
 
+# organization_id -> frozenset(user_id), загружается лениво на организацию.
+# Отказ перепроверяется в базе: ответственного, добавленного через другой
+# воркер, кэш не отсекает. Только для проверки прав, кворум считается в базе.
+membership_cache = TTLCache(
+    maxsize=settings.cache.membership_maxsize, ttl=settings.cache.membership_ttl
+)
+
+
+def invalidate_organization_membership(*organization_ids: UUID) -> None:
+    membership_cache.invalidate(*organization_ids)
+
+
+async def get_organization_members(
+    session: AsyncSession, organization_id: UUID
+) -> FrozenSet[UUID]:
+    async def load():
+        stmt = select(OrganizationResponsible.user_id).filter(
+            OrganizationResponsible.organization_id == organization_id
+        )
+        result = await session.scalars(stmt)
+        return frozenset(result.all())
+
+    return await membership_cache.get_or_load(organization_id, load)
+
 
 async def user_is_responsible_for_organization(
     session: AsyncSession, organization_id: UUID, user_id: UUID
-):
-    organization_stmt = select(OrganizationResponsible).filter(
+) -> bool:
+    if user_id in await get_organization_members(session, organization_id):
+        return True
+    # покрывающий индекс (organization_id, user_id)
+    stmt = select(OrganizationResponsible.user_id).filter(
         OrganizationResponsible.organization_id == organization_id,
         OrganizationResponsible.user_id == user_id,
     )
-    result = await session.scalars(organization_stmt)
-    return result.first()
+    if (await session.scalars(stmt.limit(1))).first() is None:
+        return False
+    # состав устарел: со следующим запросом загрузится заново
+    invalidate_organization_membership(organization_id)
+    return True
 
 
-async def get_user_organization_id(session: AsyncSession, user_id: UUID):
-    organization_stmt = select(OrganizationResponsible.organization_id).filter(
-        OrganizationResponsible.user_id == user_id
+async def get_responsible_count(session: AsyncSession, organization_id: UUID) -> int:
+    """
+    Число ответственных одним COUNT в транзакции вызывающего, без кэша:
+    от него зависит кворум, и устаревший на ttl состав его бы исказил.
+    """
+    stmt = select(func.count()).where(
+        OrganizationResponsible.organization_id == organization_id
     )
-    result = await session.scalars(organization_stmt)
-    return result.first()
+    return await session.scalar(stmt)
@@ -1,15 +1,24 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.bulk import BULK_DESCRIPTION, InvalidBulkBodyError, bulk_import
 from api.employees.dependices import get_user_by_id
+from api.organization_responsibles.crud import (
+    create_organization_responsibles_batch,
+)
+from api.organization_responsibles.dependices import (
+    invalidate_organization_membership,
+)
 from api.organizations.dependices import get_organization_by_id
 from core.models.business_models import OrganizationResponsible
 from core.models.db_helper import database_helper
+from core.schemas.bulk import BulkImportResult
 from core.schemas.organization_responsible import OrganizationResponsiblesCreate
 from error_response_models import (
+    BadRequestErrorResponse,
     OrganizationNotExistErrorResponse,
     UserNotExistErrorResponse,
 )
@@ -38,6 +47,7 @@ async def create_organization_responsible(
     session.add(new_organization_responsible)
     await session.commit()
     await session.refresh(new_organization_responsible)
+    invalidate_organization_membership(new_organization_responsible.organization_id)
     return {
         "message": "new_organization_responsible created successfully",
         "organization_responsible": new_organization_responsible,
@@ -55,3 +65,24 @@ async def get_all_organization_responsibles(
     stmt = select(OrganizationResponsible)
     result = await session.scalars(stmt)
     return result.all()
+
+
+@organization_responsibles_router.post(
+    "/bulk",
+    description=f"Массовая запись отвественных за организации. {BULK_DESCRIPTION}",
+    response_model=BulkImportResult,
+    status_code=200,
+)
+async def create_organization_responsibles_bulk(
+    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    request: Request,
+):
+    try:
+        return await bulk_import(
+            session,
+            request,
+            OrganizationResponsiblesCreate,
+            create_organization_responsibles_batch,
+        )
+    except InvalidBulkBodyError as exc:
+        return BadRequestErrorResponse(content=str(exc))
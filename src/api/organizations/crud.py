@@ -0,0 +1,18 @@
+from typing import List, Tuple
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.bulk import Batch, insert_rows
+from core.models.business_models import Organization
+from core.schemas.bulk import BulkRowError
+
+
+async def create_organizations_batch(
+    session: AsyncSession, batch: Batch
+) -> Tuple[int, List[BulkRowError]]:
+    rows = [
+        (index, {"id": uuid4(), **organization.model_dump()})
+        for index, organization in batch
+    ]
+    return await insert_rows(session, Organization, rows)
@@ -1,12 +1,16 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.bulk import BULK_DESCRIPTION, InvalidBulkBodyError, bulk_import
+from api.organizations.crud import create_organizations_batch
 from core.models.business_models import Organization
 from core.models.db_helper import database_helper
+from core.schemas.bulk import BulkImportResult
 from core.schemas.organization import OrganizationCreate
+from error_response_models import BadRequestErrorResponse
 
 organization_router = APIRouter(prefix="/organizations", tags=["organizations"])
 
@@ -39,3 +43,21 @@ async def create_new_organization(
         "message": "Organization created successfully",
         "Organization": new_organization,
     }
+
+
+@organization_router.post(
+    "/bulk",
+    description=f"Массовое создание организаций. {BULK_DESCRIPTION}",
+    response_model=BulkImportResult,
+    status_code=200,
+)
+async def create_organizations_bulk(
+    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    request: Request,
+):
+    try:
+        return await bulk_import(
+            session, request, OrganizationCreate, create_organizations_batch
+        )
+    except InvalidBulkBodyError as exc:
+        return BadRequestErrorResponse(content=str(exc))
@@ -1,50 +1,119 @@
-from typing import Sequence
+from typing import Dict, Iterable, List, Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.tenders.dependies import (
+    TenderFilters,
+    cache_render_session,
+    invalidate_tender_pages,
+    tender_pages_cache,
+)
+from core.history import (
+    State,
+    capture_state,
+    commit_versioned_update,
+    decode_state,
+    load_versions,
+    new_revision,
+    next_state,
+)
 from core.models.business_enums import ServiceType, TenderStatus
-from core.models.business_models import Tender, TenderHistory
-from core.schemas.tender import TenderCreate, TenderUpdate
+from core.models.business_models import Tender, TenderRevision, tender_search
+from core.pagination import Cursor, paginate
+from core.response_cache import CachedResponse
+from core.schemas.tender import TenderCreate, TenderResponse, TenderUpdate
+from core.serialization import RowSerializer
 
+# статус версионируется, как у предложений: смена статуса тоже дает версию,
+# и ее строка истории не пустая
+TENDER_VERSIONED_FIELDS = ("name", "description", "service_type", "status")
 
-async def get_history_tender(
-    session: AsyncSession, tenderID: UUID, username: str, version: int
-):
-    stmt = select(TenderHistory).filter(
-        TenderHistory.refer_tender_id == tenderID,
-        TenderHistory.creator_username == username,
-        TenderHistory.version == version,
+# строки списков: поля TenderResponse и updated_at для ETag страницы
+TENDER_ROWS = RowSerializer(Tender, TenderResponse, extra=("updated_at",))
+
+
+def tenders_page(
+    limit: int,
+    offset: int,
+    filters: TenderFilters,
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    return paginate(
+        TENDER_ROWS.select().where(*filters.conditions()),
+        Tender.name,
+        Tender.id,
+        limit,
+        offset,
+        cursor,
     )
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
 
 
 async def get_tenders(
-    session: AsyncSession, limit: int, offset: int, service_type: ServiceType
-) -> Sequence[Tender]:
-    stmt = (
-        select(Tender)
-        .limit(limit)
-        .offset(offset)
-        .where(Tender.service_type == service_type)
-        .order_by(Tender.name)
-    )
-    result = await session.scalars(stmt)
+    session: AsyncSession,
+    limit: int,
+    offset: int,
+    filters: TenderFilters,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    stmt = tenders_page(limit, offset, filters, cursor)
+    result = await session.execute(stmt)
     return result.all()
 
 
-async def get_user_tender(
-    session: AsyncSession, tenderID: UUID, username: str
-) -> Tender:
-    stmt = (
-        select(Tender)
-        .filter(Tender.id == tenderID, Tender.creator_username == username)
-        .order_by(Tender.version.desc())
+async def count_tenders(session: AsyncSession, filters: TenderFilters) -> int:
+    """
+    Общее число тендеров по фильтрам. Счетчик каждого service_type лежит
+    в кэше страниц его пространства и сбрасывается вместе с ними, так что
+    COUNT выполняется только после записи, а не на каждую страницу.
+    Промахи считаются одним COUNT с GROUP BY service_type, с выключенным
+    кэшем - тоже одним.
+    """
+
+    async def render(namespaces: List[str]) -> Dict[str, CachedResponse]:
+        service_types = [ServiceType(namespace) for namespace in namespaces]
+        stmt = (
+            select(Tender.service_type, func.count())
+            .where(
+                Tender.service_type.in_(service_types),
+                *filters.conditions(with_service_type=False),
+            )
+            .group_by(Tender.service_type)
+        )
+        async with cache_render_session(session) as render_session:
+            counts = dict((await render_session.execute(stmt)).all())
+        return {
+            service_type.value: CachedResponse(
+                str(counts.get(service_type, 0)).encode(), {}
+            )
+            for service_type in service_types
+        }
+
+    counters = await tender_pages_cache.get_or_render_many(
+        [item.value for item in filters.service_types or tuple(ServiceType)],
+        f"count:{filters.cache_key()}",
+        render,
     )
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
+    return sum(int(counter.body) for counter in counters.values())
+
+
+async def count_page_tenders(
+    session: AsyncSession,
+    filters: TenderFilters,
+    rows: Sequence[Row],
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor] = None,
+) -> int:
+    """
+    X-Total-Count для страницы rows, выбранной со строкой сверх limit.
+    Последняя страница от известной позиции сама дает точное число из того
+    же чтения, что и тело; иначе - count_tenders.
+    """
+    if cursor is None and len(rows) <= limit and (rows or offset == 0):
+        return offset + len(rows)
+    return await count_tenders(session, filters)
 
 
 async def get_tender(session: AsyncSession, tenderID: UUID) -> Tender | None:
@@ -56,84 +125,134 @@ async def create_tender(session: AsyncSession, tender: TenderCreate) -> Tender:
     session.add(new_tender)
     await session.commit()
     await session.refresh(new_tender)
+    tender_search.index(session, new_tender)
+    await invalidate_tender_pages(new_tender.service_type)
     return new_tender
 
 
-async def get_user_tenders(
-    session: AsyncSession, limit: int, offset: int, username: str
-) -> Sequence[Tender]:
-    stmt = (
-        select(Tender)
-        .limit(limit)
-        .offset(offset)
-        .where(Tender.creator_username == username)
-        .order_by(Tender.name)
+async def search_tenders(
+    session: AsyncSession,
+    text: str,
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    return await tender_search.search(
+        session, TENDER_ROWS.columns, text, limit, offset, cursor
     )
-    result = await session.scalars(stmt)
-    return result.all()
 
 
-async def get_tender_status(session: AsyncSession, tenderID, username: str) -> Tender:
-    stmt = select(Tender).filter(
-        Tender.id == tenderID, Tender.creator_username == username
+async def get_user_tenders(
+    session: AsyncSession,
+    limit: int,
+    offset: int,
+    username: str,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    stmt = paginate(
+        TENDER_ROWS.select().where(Tender.creator_username == username),
+        Tender.name,
+        Tender.id,
+        limit,
+        offset,
+        cursor,
     )
     result = await session.execute(stmt)
-    tender = result.scalar_one_or_none()
-    return tender
+    return result.all()
 
 
 async def change_tender_status(
-    session: AsyncSession, tenderID: UUID, new_status: TenderStatus, username: str
-) -> Tender:
-    stmt = select(Tender).filter(
-        Tender.id == tenderID, Tender.creator_username == username
+    session: AsyncSession, tender: Tender, new_status: TenderStatus
+) -> Optional[Tender]:
+    return await _commit_new_version(session, tender, {"status": new_status})
+
+
+async def close_tender(session: AsyncSession, tender_id: UUID) -> Optional[Tender]:
+    """
+    Закрытие по кворуму внутри транзакции голоса, без коммита. Строка
+    тендера блокируется до конца транзакции, закрытие - новая версия со
+    строкой истории, как любая смена статуса. None - тендер уже закрыт.
+    """
+    tender = await session.scalar(
+        select(Tender)
+        .where(Tender.id == tender_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
     )
-    result = await session.execute(stmt)
-    tender = result.scalar_one_or_none()
-    tender.status = new_status
-    await session.commit()
-    await session.refresh(tender)
+    if tender is None or tender.status == TenderStatus.CLOSED:
+        return None
+    changes = {"status": TenderStatus.CLOSED}
+    old_state = capture_state(tender, TENDER_VERSIONED_FIELDS)
+    session.add(
+        new_revision(
+            TenderRevision,
+            "tender_id",
+            tender,
+            old_state,
+            next_state(old_state, changes),
+        )
+    )
+    tender.status = TenderStatus.CLOSED
+    tender.version += 1
     return tender
 
 
 async def update_tender(
-    session: AsyncSession, tenderID: UUID, tender_update: TenderUpdate, username: str
-) -> Tender:
-    tender = await get_user_tender(session, tenderID, username)
-    old_tender_entry = TenderHistory(
-        refer_tender_id=tender.id,
-        name=tender.name,
-        description=tender.description,
-        service_type=tender.service_type,
-        status=tender.status,
-        version=tender.version,
-        organization_id=tender.organization_id,
-        creator_username=tender.creator_username,
+    session: AsyncSession, tender: Tender, tender_update: TenderUpdate
+) -> Optional[Tender]:
+    changes = tender_update.model_dump(exclude_unset=True)
+    return await _commit_new_version(session, tender, changes)
+
+
+async def _commit_new_version(
+    session: AsyncSession, tender: Tender, changes: dict
+) -> Optional[Tender]:
+    # правка может перенести тендер в другой service_type
+    old_service_type = tender.service_type
+    updated = await commit_versioned_update(
+        session, TenderRevision, "tender_id", tender, TENDER_VERSIONED_FIELDS, changes
     )
-    for name, value in tender_update.model_dump(exclude_unset=True).items():
-        setattr(tender, name, value)
-    tender.version += 1
-    session.add(old_tender_entry)
-    await session.commit()
-    await session.refresh(tender)
-    return tender
+    if updated is not None:
+        tender_search.index(session, updated)
+        await invalidate_tender_pages(old_service_type, updated.service_type)
+    return updated
 
 
-async def rollback_tender(
-    session: AsyncSession, tenderId: UUID, version: int, username: str
-) -> Tender:
-    history_tender = await get_history_tender(session, tenderId, username, version)
-    tender = await get_user_tender(session, tenderId, username)
-    # Set attributes by tender version
-    tender.name = history_tender.name
-    tender.description = history_tender.description
-    tender.service_type = history_tender.service_type
-    tender.version += 1
-    tender.organization_id = history_tender.organization_id
-    tender.creator_username = history_tender.creator_username
-    tender.created_at = history_tender.created_at
-    tender.updated_at = history_tender.updated_at
+async def get_tender_versions(
+    session: AsyncSession, tender: Tender, versions: Iterable[int]
+) -> Dict[int, State]:
+    return await load_versions(
+        session,
+        TenderRevision,
+        TenderRevision.tender_id,
+        tender,
+        TENDER_VERSIONED_FIELDS,
+        versions,
+    )
 
-    await session.commit()
-    await session.refresh(tender)
-    return tender
+
+async def get_tender_revisions(
+    session: AsyncSession,
+    tender_id: UUID,
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[TenderRevision]:
+    stmt = paginate(
+        select(TenderRevision).where(TenderRevision.tender_id == tender_id),
+        TenderRevision.version,
+        TenderRevision.id,
+        limit,
+        offset,
+        cursor,
+    )
+    result = await session.scalars(stmt)
+    return result.all()
+
+
+async def rollback_tender(
+    session: AsyncSession, tender: Tender, state: State
+) -> Optional[Tender]:
+    """Делает восстановленное состояние версии новой текущей версией."""
+    changes = decode_state(Tender, state)
+    return await _commit_new_version(session, tender, changes)
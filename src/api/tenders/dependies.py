@@ -1,21 +1,166 @@
-from typing import Optional
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, NamedTuple, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select
+from fastapi import Query
+from sqlalchemy import ColumnElement, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.models.business_models import Tender
+from core.config import settings
+from core.etag import if_match_satisfied, resource_etag
+from core.models.business_enums import ServiceType, TenderStatus
+from core.models.business_models import Employee, Tender
+from core.models.db_helper import database_helper
+from core.response_cache import ResponseCache, create_response_backend
+from error_response_models import (
+    BaseErrorResponse,
+    PreconditionFailedErrorResponse,
+    TenderNotExistErrorResponse,
+    UserIsNotResponsibleForTenderErrorResponse,
+    UserNotExistErrorResponse,
+)
+
+# Готовые страницы GET /tenders/ без курсора, пространство - service_type
+tender_pages_cache = ResponseCache(create_response_backend(settings.response_cache))
+
+
+async def invalidate_tender_pages(*service_types: ServiceType) -> None:
+    await tender_pages_cache.invalidate(*{item.value for item in service_types})
+
+
+@asynccontextmanager
+async def cache_render_session(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Сессия для промаха кэша страниц. Отставшая реплика отдала бы страницу
+    до последней записи, и та пролежала бы в кэше весь TTL, поэтому
+    сохраняемое читается с первичной.
+    """
+    if tender_pages_cache.backend is None or session.bind is database_helper.engine:
+        yield session
+        return
+    async with database_helper.session_factory() as primary:
+        yield primary
+
+
+class TenderFilters(NamedTuple):
+    """Фильтры списка тендеров; пустой кортеж - без ограничения."""
+
+    service_types: Tuple[ServiceType, ...] = ()
+    statuses: Tuple[TenderStatus, ...] = ()
+    organization_ids: Tuple[UUID, ...] = ()
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    def conditions(self, with_service_type: bool = True) -> List[ColumnElement]:
+        conditions = []
+        if self.service_types and with_service_type:
+            conditions.append(Tender.service_type.in_(self.service_types))
+        if self.statuses:
+            conditions.append(Tender.status.in_(self.statuses))
+        if self.organization_ids:
+            conditions.append(Tender.organization_id.in_(self.organization_ids))
+        if self.created_from is not None:
+            conditions.append(Tender.created_at >= self.created_from)
+        if self.created_to is not None:
+            conditions.append(Tender.created_at < self.created_to)
+        return conditions
+
+    @property
+    def cache_namespace(self) -> Optional[str]:
+        """Пространство кэша страниц: есть, только если service_type ровно один."""
+        if len(self.service_types) != 1:
+            return None
+        return self.service_types[0].value
+
+    def cache_key(self) -> str:
+        """Ключ остальных фильтров, service_type задает пространство кэша."""
+        dates = [
+            value.isoformat() if value is not None else ""
+            for value in (self.created_from, self.created_to)
+        ]
+        return ";".join(
+            [
+                ",".join(status.value for status in self.statuses),
+                ",".join(str(org_id) for org_id in self.organization_ids),
+                *dates,
+            ]
+        )
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # created_at хранится без часового пояса, в UTC
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def tender_filters(
+    service_type: List[ServiceType] = Query(
+        default=[], description="Один или несколько видов услуг, по умолчанию все"
+    ),
+    status: List[TenderStatus] = Query(default=[]),
+    organization_id: List[UUID] = Query(default=[]),
+    created_from: Optional[datetime] = Query(
+        default=None, description="created_at не раньше, включительно"
+    ),
+    created_to: Optional[datetime] = Query(
+        default=None, description="created_at раньше, не включительно"
+    ),
+) -> TenderFilters:
+    # повторы убираются, порядок фиксируется для ключа кэша
+    return TenderFilters(
+        service_types=tuple(sorted(set(service_type), key=lambda item: item.value)),
+        statuses=tuple(sorted(set(status), key=lambda item: item.value)),
+        organization_ids=tuple(sorted(set(organization_id))),
+        created_from=_naive_utc(created_from),
+        created_to=_naive_utc(created_to),
+    )
+
+
+class TenderAccess(NamedTuple):
+    user: Optional[Employee]
+    tender: Optional[Tender]
+
+    @property
+    def is_responsible(self) -> bool:
+        return self.tender.creator_username == self.user.username
+
+    def error_response(self) -> Optional[BaseErrorResponse]:
+        if self.user is None:
+            return UserNotExistErrorResponse()  # 401
+        # 404 раньше 403: ответственность за несуществующий тендер не проверить
+        if self.tender is None:
+            return TenderNotExistErrorResponse()  # 404
+        if not self.is_responsible:
+            return UserIsNotResponsibleForTenderErrorResponse()  # 403
+        return None
+
+    def precondition_response(
+        self, if_match: Optional[str]
+    ) -> Optional[BaseErrorResponse]:
+        """error_response плюс проверка If-Match по текущей версии тендера."""
+        if error := self.error_response():
+            return error
+        if not if_match_satisfied(if_match, resource_etag(self.tender)):
+            return PreconditionFailedErrorResponse()  # 412
+        return None
 
 
 async def get_tender_by_id(session: AsyncSession, tenderID: UUID) -> Optional[Tender]:
     return await session.get(Tender, tenderID)
 
 
-async def user_is_responsible_for_tender(
-    session: AsyncSession, tenderID: UUID, creator_username: str
-):
-    stmt = select(Tender).filter(
-        Tender.id == tenderID, Tender.creator_username == creator_username
+async def resolve_tender_access(
+    session: AsyncSession, tenderID: UUID, username: str
+) -> TenderAccess:
+    """Пользователь и тендер одним запросом вместо трех последовательных."""
+    stmt = (
+        select(Employee, Tender)
+        .outerjoin(Tender, Tender.id == tenderID)
+        .where(Employee.username == username)
     )
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        return TenderAccess(user=None, tender=None)
+    return TenderAccess(user=row.Employee, tender=row.Tender)
@@ -1,8 +1,8 @@
 import logging
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,15 +11,43 @@ from api.organization_responsibles.dependices import (
     user_is_responsible_for_organization,
 )
 from api.tenders import crud
-from api.tenders.dependies import get_tender_by_id, user_is_responsible_for_tender
-from core.models.business_enums import ServiceType, TenderStatus
+from api.tenders.dependies import (
+    TenderFilters,
+    cache_render_session,
+    resolve_tender_access,
+    tender_filters,
+    tender_pages_cache,
+)
+from core.etag import (
+    IfMatch,
+    IfNoneMatch,
+    if_none_match_satisfied,
+    list_etag,
+    not_modified,
+    page_etag,
+    resource_etag,
+    set_etag,
+    versioned_response,
+)
+from core.models.business_enums import TenderStatus
 from core.models.db_helper import database_helper
+from core.pagination import (
+    Cursor,
+    name_cursor_query,
+    next_page_headers,
+    next_page_token,
+    set_next_page_headers,
+    version_cursor_query,
+)
+from core.response_cache import CachedResponse
+from core.schemas.history import RevisionResponse, VersionDiff
 from core.schemas.tender import TenderCreate, TenderResponse, TenderUpdate
+from core.search import rank_cursor_query
+from core.serialization import RawJSONResponse, page_response
 from error_response_models import (
-    TenderNotExistErrorResponse,
     UserIsNotResponsibleForOrganizationErrorResponse,
-    UserIsNotResponsibleForTenderErrorResponse,
     UserNotExistErrorResponse,
+    VersionNotExistErrorResponse,
 )
 
 tenders_router = APIRouter(prefix="/tenders", tags=["tenders"])
@@ -29,17 +57,61 @@ logger = logging.getLogger(__name__)
 
 @tenders_router.get(
     "/",
-    description="Получение списка тендеров",
+    description="Получение списка тендеров; фильтры с несколькими значениями "
+    "повторяются в запросе, общее число - в X-Total-Count",
     response_model=List[TenderResponse],
     status_code=200,
 )
 async def get_all_tenders(
-    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    request: Request,
+    cursor: Annotated[Optional[Cursor], Depends(name_cursor_query)],
+    filters: Annotated[TenderFilters, Depends(tender_filters)],
     limit: int = Query(default=5, ge=0),
     offset: int = Query(default=0, ge=0),
-    service_type: ServiceType = Query(),
+    if_none_match: IfNoneMatch = None,
 ):
-    return await crud.get_tenders(session, limit, offset, service_type)
+    namespace = filters.cache_namespace
+    if cursor is None and namespace is not None:
+
+        async def render() -> CachedResponse:
+            async with cache_render_session(session) as render_session:
+                tenders = await crud.get_tenders(render_session, limit, offset, filters)
+                total = await crud.count_page_tenders(
+                    render_session, filters, tenders, limit, offset
+                )
+            token = next_page_token(tenders, "name", limit)
+            headers = {"ETag": list_etag(tenders, total), "X-Total-Count": str(total)}
+            if token is not None:
+                headers["X-Next-Cursor"] = token
+            return CachedResponse(crud.TENDER_ROWS.dumps(tenders[:limit]), headers)
+
+        page = await tender_pages_cache.get_or_render(
+            namespace, f"{limit}:{offset}:{filters.cache_key()}", render
+        )
+        etag = page.headers["ETag"]
+        if if_none_match_satisfied(if_none_match, etag):
+            return not_modified(etag)
+        headers = {
+            "ETag": etag,
+            "X-Total-Count": page.headers["X-Total-Count"],
+            **next_page_headers(request, page.headers.get("X-Next-Cursor")),
+        }
+        return RawJSONResponse(page.body, headers=headers)
+
+    total = None
+    if if_none_match is not None:
+        total = await crud.count_tenders(session, filters)
+        page = crud.tenders_page(limit, offset, filters, cursor)
+        etag = await page_etag(session, page, total)
+        if if_none_match_satisfied(if_none_match, etag):
+            return not_modified(etag)
+    tenders = await crud.get_tenders(session, limit, offset, filters, cursor)
+    if total is None:
+        total = await crud.count_page_tenders(
+            session, filters, tenders, limit, offset, cursor
+        )
+    return page_response(request, crud.TENDER_ROWS, tenders, limit, total=total)
 
 
 @tenders_router.post(
@@ -51,6 +123,7 @@ async def get_all_tenders(
 async def create_new_tender(
     session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
     tender: TenderCreate,
+    response: Response,
 ):
     user = await get_user_by_username(session, tender.creator_username)
     if not user:
@@ -59,7 +132,10 @@ async def create_new_tender(
         session, tender.organization_id, user.id
     ):
         return UserIsNotResponsibleForOrganizationErrorResponse()  # 403
-    return await crud.create_tender(session, tender)
+    new_tender = await crud.create_tender(session, tender)
+    database_helper.mark_write(tender.creator_username)
+    set_etag(response, new_tender)
+    return new_tender
 
 
 @tenders_router.get(
@@ -68,33 +144,54 @@ async def create_new_tender(
     response_model=List[TenderResponse],
 )
 async def get_user_tenders(
-    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    request: Request,
+    cursor: Annotated[Optional[Cursor], Depends(name_cursor_query)],
     limit: int = Query(default=5, ge=0),
     offset: int = Query(default=0, ge=0),
     username: str = Query(default="test_user"),
 ):
     if not await get_user_by_username(session, username):
         return UserNotExistErrorResponse()  # 401
-    return await crud.get_user_tenders(session, limit, offset, username)
+    tenders = await crud.get_user_tenders(session, limit, offset, username, cursor)
+    return page_response(request, crud.TENDER_ROWS, tenders, limit)
+
+
+@tenders_router.get(
+    "/search",
+    description="Поиск тендеров по названию и описанию, от релевантных к менее",
+    response_model=List[TenderResponse],
+)
+async def search_tenders(
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    request: Request,
+    cursor: Annotated[Optional[Cursor], Depends(rank_cursor_query)],
+    q: str = Query(min_length=1, max_length=200, description="Слова или их начала"),
+    limit: int = Query(default=5, ge=0),
+    offset: int = Query(default=0, ge=0),
+):
+    tenders = await crud.search_tenders(session, q, limit, offset, cursor)
+    return page_response(request, crud.TENDER_ROWS, tenders, limit, key_attr="rank")
 
 
 @tenders_router.get(
     "/{tenderId}/status", description="Получение текущего статуса тендера"
 )
 async def get_tender_status_by_id(
-    session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
     tender_id: Annotated[UUID, Path(..., alias="tenderId")],
     username: str = Query(default="test_user"),
+    if_none_match: IfNoneMatch = None,
 ):
-    user = await get_user_by_username(session, username)
-    if not user:
-        return UserNotExistErrorResponse()  # 401
-    if not await user_is_responsible_for_tender(session, tender_id, user.username):
-        return UserIsNotResponsibleForTenderErrorResponse()  # 403
-    if not await get_tender_by_id(session, tender_id):
-        return TenderNotExistErrorResponse()  # 404
-    if tender_data := await crud.get_tender_status(session, tender_id, username):
-        return JSONResponse(status_code=200, content=tender_data.status.value)
+    access = await resolve_tender_access(session, tender_id, username)
+    if error := access.error_response():
+        return error
+    etag = resource_etag(access.tender)
+    if if_none_match_satisfied(if_none_match, etag):
+        return not_modified(etag)
+    return JSONResponse(
+        status_code=200, content=access.tender.status.value, headers={"ETag": etag}
+    )
 
 
 @tenders_router.put(
@@ -106,18 +203,15 @@ async def change_tender_status(
     session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
     tender_id: Annotated[UUID, Path(..., alias="tenderId")],
     new_tender_status: TenderStatus,
+    response: Response,
     username: str = Query(default="test_user"),
+    if_match: IfMatch = None,
 ):
-    user = await get_user_by_username(session, username)
-    if not user:
-        return UserNotExistErrorResponse()  # 401
-    if not await user_is_responsible_for_tender(session, tender_id, user.username):
-        return UserIsNotResponsibleForTenderErrorResponse()  # 403
-    if not await get_tender_by_id(session, tender_id):
-        return TenderNotExistErrorResponse()  # 404
-    return await crud.change_tender_status(
-        session, tender_id, new_tender_status, username
-    )
+    access = await resolve_tender_access(session, tender_id, username)
+    if error := access.precondition_response(if_match):
+        return error
+    tender = await crud.change_tender_status(session, access.tender, new_tender_status)
+    return versioned_response(response, tender)
 
 
 @tenders_router.patch(
@@ -129,16 +223,15 @@ async def edit_tender_data(
     session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
     tender_id: Annotated[UUID, Path(..., alias="tenderId")],
     tender_update: TenderUpdate,
+    response: Response,
     username: str = Query(default="test_user"),
+    if_match: IfMatch = None,
 ):
-    user = await get_user_by_username(session, username)
-    if not user:
-        return UserNotExistErrorResponse()  # 401
-    if not await user_is_responsible_for_tender(session, tender_id, user.username):
-        return UserIsNotResponsibleForTenderErrorResponse()  # 403
-    if not await get_tender_by_id(session, tender_id):
-        return TenderNotExistErrorResponse()  # 404
-    return await crud.update_tender(session, tender_id, tender_update, username)
+    access = await resolve_tender_access(session, tender_id, username)
+    if error := access.precondition_response(if_match):
+        return error
+    tender = await crud.update_tender(session, access.tender, tender_update)
+    return versioned_response(response, tender)
 
 
 @tenders_router.put(
@@ -150,13 +243,64 @@ async def rollback_tender_to_version(
     session: Annotated[AsyncSession, Depends(database_helper.session_getter)],
     tender_id: Annotated[UUID, Path(..., alias="tenderId")],
     version: Annotated[int, Path(..., ge=1)],
+    response: Response,
     username: str = Query(default="test_user"),
+    if_match: IfMatch = None,
 ):
-    user = await get_user_by_username(session, username)
-    if not user:
-        return UserNotExistErrorResponse()  # 401
-    if not await user_is_responsible_for_tender(session, tender_id, user.username):
-        return UserIsNotResponsibleForTenderErrorResponse()  # 403
-    if not await get_tender_by_id(session, tender_id):
-        return TenderNotExistErrorResponse()  # 404
-    return await crud.rollback_tender(session, tender_id, version, username)
+    access = await resolve_tender_access(session, tender_id, username)
+    if error := access.precondition_response(if_match):
+        return error
+    states = await crud.get_tender_versions(session, access.tender, [version])
+    if version not in states:
+        return VersionNotExistErrorResponse()
+    tender = await crud.rollback_tender(session, access.tender, states[version])
+    return versioned_response(response, tender)
+
+
+@tenders_router.get(
+    "/{tenderId}/versions",
+    description="Прошлые версии тендера, от старых к новым",
+    response_model=List[RevisionResponse],
+)
+async def get_tender_versions(
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    tender_id: Annotated[UUID, Path(..., alias="tenderId")],
+    request: Request,
+    response: Response,
+    cursor: Annotated[Optional[Cursor], Depends(version_cursor_query)],
+    username: str = Query(default="test_user"),
+    limit: int = Query(default=5, ge=0),
+    offset: int = Query(default=0, ge=0),
+):
+    access = await resolve_tender_access(session, tender_id, username)
+    if error := access.error_response():
+        return error
+    revisions = await crud.get_tender_revisions(
+        session, tender_id, limit, offset, cursor
+    )
+    return set_next_page_headers(request, response, revisions, "version", limit)
+
+
+@tenders_router.get(
+    "/{tenderId}/diff",
+    description="Изменения полей тендера между двумя версиями",
+    response_model=VersionDiff,
+)
+async def diff_tender_versions(
+    session: Annotated[AsyncSession, Depends(database_helper.read_session_getter)],
+    tender_id: Annotated[UUID, Path(..., alias="tenderId")],
+    from_version: Annotated[int, Query(..., alias="from", ge=1)],
+    to_version: Annotated[int, Query(..., alias="to", ge=1)],
+    username: str = Query(default="test_user"),
+):
+    access = await resolve_tender_access(session, tender_id, username)
+    if error := access.error_response():
+        return error
+    states = await crud.get_tender_versions(
+        session, access.tender, [from_version, to_version]
+    )
+    if from_version not in states or to_version not in states:
+        return VersionNotExistErrorResponse()
+    return VersionDiff.between(
+        from_version, states[from_version], to_version, states[to_version]
+    )
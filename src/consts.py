@@ -15,3 +15,9 @@ USER_IS_NOT_RESPONSIBLE_BID_CONTENT = (
 BAD_REQUEST_CONTENT = (
     "Данные неправильно сформированы или не соответствуют требованиям."
 )
+INVALID_CURSOR_CONTENT = "Некорректный курсор пагинации."
+DUPLICATE_USERNAME_CONTENT = "Пользователь с таким username уже существует."
+BULK_ROW_CONFLICT_CONTENT = "Строка не записана из-за конфликта в базе данных"
+VERSION_NOT_FOUND_CONTENT = "Версия не найдена или ее история недоступна."
+PRECONDITION_FAILED_CONTENT = "Версия изменилась с момента чтения, перечитайте ресурс."
+INTERNAL_ACCESS_DENIED_CONTENT = "Нужен верный X-Internal-Token."
@@ -1,6 +1,7 @@
 from pathlib import Path
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, PostgresDsn
+from pydantic import BaseModel, PostgresDsn, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,10 +10,109 @@ class ApiPrefix(BaseModel):
 
 
 class DatabaseConfig(BaseModel):
-    echo: bool = True
+    # Полный URL первичной базы вместо DB_USER/DB_PASSWORD/..., например SQLite
+    url: Optional[str] = None
+    replica_urls: List[str] = []
+    # секунды, в течение которых чтения пользователя после записи идут в первичную
+    read_your_writes_window: float = 5.0
+    echo: bool = False
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    pool_pre_ping: bool = True
+    # секунды; соединение старше пересоздается до выдачи из пула
+    pool_recycle: int = 1800
+    pool_timeout: float = 30.0
+    # LIFO держит горячими несколько соединений, лишние закрываются по recycle
+    pool_use_lifo: bool = True
+    statement_cache_size: int = 100
+
+
+class CacheConfig(BaseModel):
+    identity_maxsize: int = 10_000
+    identity_ttl: float = 60.0
+    # секунды для "пользователя нет": он может появиться через другой воркер
+    identity_negative_ttl: float = 1.0
+    membership_maxsize: int = 10_000
+    # секунды; сброс при изменении виден только своему воркеру, поэтому
+    # снятый ответственный сохраняет доступ в других воркерах не дольше ttl
+    membership_ttl: float = 5.0
+
+
+class ResponseCacheConfig(BaseModel):
+    # lru - в памяти воркера; redis - общий для воркеров, нужен пакет redis;
+    # local-redis - тот же формат в памяти, для тестов без сервера; off - выключен
+    backend: Literal["lru", "redis", "local-redis", "off"] = "lru"
+    maxsize: int = 1024
+    # секунды; страховка, сброс при записи точный
+    ttl: float = 30.0
+    redis_url: str = "redis://localhost:6379/0"
+
+
+class QueryStatsConfig(BaseModel):
+    # заголовки X-DB-* в каждом ответе, только для отладки
+    debug_headers: bool = False
+    # запросы дольше порога (мс) пишутся в лог медленных с долей slow_sample_rate
+    slow_threshold_ms: float = 200.0
+    slow_sample_rate: float = 1.0
+
+
+class MetricsConfig(BaseModel):
+    # общий каталог воркеров для /metrics; None - только текущий процесс
+    multiprocess_dir: Optional[str] = None
+    # секунды между записями состояния воркера в каталог
+    flush_interval: float = 5.0
+
+
+class HealthConfig(BaseModel):
+    # секунды на проверку базы в /health/ready
+    check_timeout: float = 1.0
+    # секунды, в течение которых проба отдает прошлый результат
+    cache_ttl: float = 2.0
+    # минимум свободных соединений пула для готовности
+    min_pool_headroom: int = 1
+    # секунды между SIGTERM и закрытием сокетов: /health/ready уже 503,
+    # новые запросы еще принимаются
+    pre_stop_delay: float = 5.0
+    # секунды ожидания запросов в работе при остановке
+    drain_timeout: float = 10.0
+
+
+class ServerConfig(BaseModel):
+    host: str = "0.0.0.0"
+    port: int = 8080
+    # 0 - по числу доступных процессу ядер
+    workers: int = 0
+    # очередь соединений, еще не принятых воркерами
+    backlog: int = 2048
+    # секунды; больше idle timeout балансировщика, иначе он ловит закрытые соединения
+    keep_alive: int = 65
+    # воркер перезапускается после стольких запросов (+ случайно до jitter),
+    # None - никогда
+    max_requests: Optional[int] = 10_000
+    max_requests_jitter: int = 1_000
+    # соединений с каждой базой на все воркеры;
+    # None - pool_size + max_overflow на воркер
+    db_connection_budget: Optional[int] = None
+
+
+class InternalConfig(BaseModel):
+    # общий токен для /internal/* в заголовке X-Internal-Token;
+    # None - внутренние маршруты закрыты
+    token: Optional[str] = None
+
+
+class BulkConfig(BaseModel):
+    batch_size: int = 1000
+
+
+class ExportConfig(BaseModel):
+    chunk_rows: int = 500
+
+
+class HistoryConfig(BaseModel):
+    # каждая N-я версия хранится целиком, остальные - обратными дельтами
+    snapshot_every: int = 10
 
 
 class DatabaseData(BaseModel):
@@ -23,9 +123,19 @@ class DatabaseData(BaseModel):
 
 
 class Settings(BaseSettings):
-    db: DatabaseData
+    db: Optional[DatabaseData] = None
     api: ApiPrefix = ApiPrefix()
     db_config: DatabaseConfig = DatabaseConfig()
+    cache: CacheConfig = CacheConfig()
+    response_cache: ResponseCacheConfig = ResponseCacheConfig()
+    query_stats: QueryStatsConfig = QueryStatsConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    health: HealthConfig = HealthConfig()
+    server: ServerConfig = ServerConfig()
+    internal: InternalConfig = InternalConfig()
+    bulk: BulkConfig = BulkConfig()
+    export: ExportConfig = ExportConfig()
+    history: HistoryConfig = HistoryConfig()
     model_config = SettingsConfigDict(
         case_sensitive=False,
         env_nested_delimiter="_",
@@ -34,8 +144,22 @@ class Settings(BaseSettings):
         extra="ignore",
     )
 
+    @field_validator("db", mode="before")
+    @classmethod
+    def skip_db_without_credentials(cls, value):
+        # Из-за разделителя "_" переменная DB_CONFIG попадает и в поле db
+        if isinstance(value, dict) and not value.keys() & DatabaseData.model_fields:
+            return None
+        return value
+
     @property
     def database_url(self) -> PostgresDsn:
+        if self.db_config.url:
+            return self.db_config.url
+        if self.db is None:
+            raise ValueError(
+                "Не заданы DB_USER/DB_PASSWORD/DB_NAME/DB_PORT или DB_CONFIG.url"
+            )
         return f"postgresql+asyncpg://{self.db.user}:{self.db.password}@db:{self.db.port}/{self.db.name}"
 
 
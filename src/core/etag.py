@@ -0,0 +1,90 @@
+import hashlib
+from datetime import datetime
+from typing import Annotated, Any, Iterable, Optional
+
+from fastapi import Header, Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from error_response_models import PreconditionFailedErrorResponse
+
+IfMatch = Annotated[
+    Optional[str],
+    Header(description="ETag версии, которую правит клиент; иначе 412"),
+]
+IfNoneMatch = Annotated[
+    Optional[str],
+    Header(description="ETag из прошлого ответа; если он актуален, 304 без тела"),
+]
+
+
+def make_etag(*parts: Any) -> str:
+    raw = "|".join(
+        part.isoformat() if isinstance(part, datetime) else str(part) for part in parts
+    )
+    return f'"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+
+def resource_etag(obj: Any) -> str:
+    """Сильный ETag строки с версией: меняется вместе с version и updated_at."""
+    return make_etag(obj.id, obj.version, obj.updated_at)
+
+
+def list_etag(rows: Iterable[Any], *extra: Any) -> str:
+    """
+    ETag страницы: меняется, если строка на ней изменилась, ушла или добавилась,
+    а также вместе с extra (например общим числом строк в заголовке).
+    """
+    parts = list(extra)
+    for row in rows:
+        parts += [row.id, row.version, row.updated_at]
+    return make_etag(*parts)
+
+
+async def page_etag(session: AsyncSession, stmt: Select, *extra: Any) -> str:
+    """
+    ETag страницы без загрузки объектов: та же выборка с теми же условиями,
+    порядком и лимитом, но только id, version и updated_at.
+    """
+    model = stmt.column_descriptions[0]["entity"]
+    fingerprint = stmt.with_only_columns(model.id, model.version, model.updated_at)
+    return list_etag(await session.execute(fingerprint), *extra)
+
+
+def set_etag(response: Response, obj: Any) -> None:
+    response.headers["ETag"] = resource_etag(obj)
+
+
+def _parse_tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def if_match_satisfied(if_match: Optional[str], etag: str) -> bool:
+    """
+    Сравнение If-Match по RFC 9110: без заголовка условие не проверяется,
+    слабые теги (W/) никогда не совпадают.
+    """
+    if if_match is None:
+        return True
+    tags = _parse_tags(if_match)
+    return "*" in tags or etag in tags
+
+
+def if_none_match_satisfied(if_none_match: Optional[str], etag: str) -> bool:
+    """Копия клиента актуальна: If-None-Match сравнивается слабо, W/ не важен."""
+    if if_none_match is None:
+        return False
+    tags = [tag.removeprefix("W/") for tag in _parse_tags(if_none_match)]
+    return "*" in tags or etag in tags
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def versioned_response(response: Response, obj: Optional[Any]) -> Any:
+    """Результат условного UPDATE: объект с новым ETag или 412 при гонке."""
+    if obj is None:
+        return PreconditionFailedErrorResponse()
+    set_etag(response, obj)
+    return obj
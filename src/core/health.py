@@ -0,0 +1,109 @@
+"""
+Готовность воркера принимать трафик для балансировщика.
+
+Проверки: запас соединений в пуле, SELECT 1 в первичной базе с
+ограничением по времени и ревизия схемы не старше кода. Результат кэшируется
+на cache_ttl секунд, параллельные пробы ждут одну проверку, поэтому
+частые пробы не добавляют нагрузки на базу. При остановке воркер
+сразу отвечает "не готов" и дожидается запросов в работе.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from core.cache import TTLCache
+from core.config import settings
+from core.migrations import current_revision, head_revision
+from core.models.db_helper import DatabaseHelper, database_helper
+from core.prometheus import HttpMetrics
+
+
+def pool_headroom(helper: DatabaseHelper) -> Dict[str, Any]:
+    """Сколько соединений первичной базы еще можно выдать."""
+    pool = helper.engine.pool
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        return {"headroom": None}
+    limit = pool.size() + pool._max_overflow
+    return {"headroom": limit - pool.checkedout(), "limit": limit}
+
+
+class ReadinessProbe:
+    def __init__(
+        self,
+        helper: DatabaseHelper,
+        head: int,
+        timeout: float,
+        cache_ttl: float,
+        min_pool_headroom: int,
+    ) -> None:
+        self.helper = helper
+        self.head = head
+        self.timeout = timeout
+        self.min_pool_headroom = min_pool_headroom
+        self.shutting_down = False
+        self._cache = TTLCache(maxsize=1, ttl=cache_ttl)
+
+    async def check(self) -> Dict[str, Any]:
+        if self.shutting_down:
+            return {"ready": False, "reason": "shutting down"}
+        return await self._cache.get_or_load("readiness", self._check)
+
+    async def _check(self) -> Dict[str, Any]:
+        pool = pool_headroom(self.helper)
+        pool["ok"] = pool["headroom"] is None or (
+            pool["headroom"] >= self.min_pool_headroom
+        )
+        checks: Dict[str, Any] = {"pool": pool}
+        if not pool["ok"]:
+            # без свободных соединений проверка базы только ждала бы пул
+            checks["database"] = {"ok": False, "error": "pool exhausted"}
+        else:
+            checks.update(await self._check_database())
+        return {
+            "ready": all(check["ok"] for check in checks.values()),
+            "checks": checks,
+        }
+
+    async def _check_database(self) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(self._query_database(), self.timeout)
+        except asyncio.TimeoutError:
+            return {"database": {"ok": False, "error": f"timeout {self.timeout}s"}}
+        except Exception as exc:
+            return {"database": {"ok": False, "error": type(exc).__name__}}
+
+    async def _query_database(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        async with self.helper.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            latency = time.perf_counter() - started
+            revision = await current_revision(conn)
+        return {
+            "database": {"ok": True, "latency_ms": round(latency * 1000, 2)},
+            "schema": {
+                "ok": revision is not None and revision >= self.head,
+                "revision": revision,
+                "head": self.head,
+            },
+        }
+
+
+async def drain(metrics: HttpMetrics, timeout: float, interval: float = 0.05) -> int:
+    """Ждет завершения запросов в работе, возвращает сколько не дождались."""
+    deadline = time.monotonic() + timeout
+    while metrics.in_flight > 0 and time.monotonic() < deadline:
+        await asyncio.sleep(interval)
+    return metrics.in_flight
+
+
+readiness_probe = ReadinessProbe(
+    database_helper,
+    head=head_revision(),
+    timeout=settings.health.check_timeout,
+    cache_ttl=settings.health.cache_ttl,
+    min_pool_headroom=settings.health.min_pool_headroom,
+)
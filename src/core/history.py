@@ -0,0 +1,181 @@
+"""
+История версий обратными дельтами.
+
+Строка истории версии v хранит значения полей версии v, которые отличаются
+от версии v + 1. Каждая history.snapshot_every версия хранится целиком.
+Версия v восстанавливается от живой строки или ближайшего снимка с номером
+не меньше v накатыванием дельт сверху вниз, то есть читается не больше
+одного снимка и snapshot_every - 1 дельт одним запросом по индексу.
+"""
+
+import enum
+from typing import Any, Dict, Iterable, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Enum, Uuid, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.config import settings
+
+State = Dict[str, Any]
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def capture_state(obj: Any, fields: Sequence[str]) -> State:
+    """Значения версионируемых полей в виде, пригодном для JSON."""
+    return {name: _encode(getattr(obj, name)) for name in fields}
+
+
+def next_state(old: State, changes: Dict[str, Any]) -> State:
+    """Состояние после правки: changes поверх old, лишние поля отбрасываются."""
+    updates = {name: _encode(value) for name, value in changes.items() if name in old}
+    return {**old, **updates}
+
+
+def decode_state(model: type, state: State) -> Dict[str, Any]:
+    """Восстановленное состояние в значениях колонок модели, для UPDATE."""
+    columns = model.__table__.c
+    values = {}
+    for name, value in state.items():
+        column_type = columns[name].type
+        if value is not None and isinstance(column_type, Enum):
+            value = column_type.enum_class(value)
+        elif value is not None and isinstance(column_type, Uuid):
+            value = UUID(value)
+        values[name] = value
+    return values
+
+
+def new_revision(
+    revision_model: type, owner_key: str, owner: Any, old: State, new: State
+):
+    """
+    Строка истории для уходящей версии owner.version.
+    Вызывается до увеличения версии, пишется тем же коммитом, что и правка.
+    """
+    version = owner.version
+    is_snapshot = version % settings.history.snapshot_every == 0
+    changes = old if is_snapshot else diff_states(new, old)
+    return revision_model(
+        **{owner_key: owner.id},
+        version=version,
+        is_snapshot=is_snapshot,
+        changes=changes,
+    )
+
+
+def diff_states(base: State, other: State) -> State:
+    """Поля other, которые отличаются от base."""
+    return {name: value for name, value in other.items() if base.get(name) != value}
+
+
+async def commit_versioned_update(
+    session: AsyncSession,
+    revision_model: type,
+    owner_key: str,
+    obj: Any,
+    fields: Sequence[str],
+    changes: Dict[str, Any],
+) -> Optional[Any]:
+    """
+    Оптимистичная блокировка по version: UPDATE ... WHERE version = :v
+    RETURNING и строка истории в одной транзакции, без перечитывания.
+    None - строку уже изменили после чтения, транзакция откатывается.
+    """
+    model = type(obj)
+    old_state = capture_state(obj, fields)
+    revision = new_revision(
+        revision_model, owner_key, obj, old_state, next_state(old_state, changes)
+    )
+    stmt = (
+        update(model)
+        .where(model.id == obj.id, model.version == obj.version)
+        .values(**changes, version=model.version + 1)
+        .returning(*model.__table__.c)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await session.execute(stmt)).one_or_none()
+    if row is None:
+        await session.rollback()
+        return None
+    # новые значения из RETURNING, без повторного SELECT
+    for key, value in row._mapping.items():
+        set_committed_value(obj, key, value)
+    session.add(revision)
+    await session.commit()
+    return obj
+
+
+async def load_versions(
+    session: AsyncSession,
+    revision_model: type,
+    owner_column: InstrumentedAttribute,
+    owner: Any,
+    fields: Sequence[str],
+    versions: Iterable[int],
+) -> Dict[int, State]:
+    """
+    Восстанавливает запрошенные версии одним запросом.
+    Версии, которых нет или для которых в истории разрыв, в ответ не попадают.
+    """
+    current = owner.version
+    live = capture_state(owner, fields)
+    wanted = {version for version in versions if 1 <= version <= current}
+    states = {current: live} if current in wanted else {}
+    older = [version for version in wanted if version < current]
+    if not older:
+        return states
+
+    low, high = min(older), max(older)
+    nearest_snapshot = (
+        select(func.min(revision_model.version))
+        .where(
+            owner_column == owner.id,
+            revision_model.version >= high,
+            revision_model.is_snapshot.is_(True),
+        )
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            revision_model.version, revision_model.is_snapshot, revision_model.changes
+        )
+        .where(
+            owner_column == owner.id,
+            revision_model.version >= low,
+            revision_model.version <= func.coalesce(nearest_snapshot, current),
+        )
+        .order_by(revision_model.version.desc())
+    )
+    state, previous = dict(live), current
+    for version, is_snapshot, changes in await session.execute(stmt):
+        if not is_snapshot and version != previous - 1:
+            break
+        state.update(changes)
+        previous = version
+        if version in wanted:
+            states[version] = dict(state)
+    return states
+
+
+async def load_version(
+    session: AsyncSession,
+    revision_model: type,
+    owner_column: InstrumentedAttribute,
+    owner: Any,
+    fields: Sequence[str],
+    version: int,
+) -> Optional[State]:
+    states = await load_versions(
+        session, revision_model, owner_column, owner, fields, [version]
+    )
+    return states.get(version)
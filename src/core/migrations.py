@@ -0,0 +1,140 @@
+"""
+Версионированные миграции схемы.
+
+Миграция - модуль migrations/NNNN_<название>.py с функцией
+async upgrade(conn); номер в имени файла - ревизия. Миграции применяются
+по порядку отдельной командой (python -m scripts.migrate), каждая в своей
+транзакции вместе с записью в schema_revision. Воркер при старте только
+читает ревизию базы одним запросом и сравнивает с последней известной.
+"""
+
+import importlib
+import logging
+import pkgutil
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+import migrations
+
+logger = logging.getLogger(__name__)
+
+schema_revision = Table(
+    "schema_revision",
+    MetaData(),
+    Column("revision", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+# pg_advisory_xact_lock: параллельные запуски migrate идут по очереди
+MIGRATION_LOCK_ID = 7_295_104
+
+
+class Migration(NamedTuple):
+    revision: int
+    name: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+
+
+class SchemaRevisionError(RuntimeError):
+    pass
+
+
+def _revision_modules() -> List[tuple]:
+    found = []
+    for module in pkgutil.iter_modules(migrations.__path__):
+        number, _, name = module.name.partition("_")
+        if number.isdigit():
+            found.append((int(number), name, module.name))
+    found.sort()
+    revisions = [revision for revision, _, _ in found]
+    if len(set(revisions)) != len(revisions):
+        raise SchemaRevisionError(f"Повторяющиеся номера миграций: {revisions}")
+    return found
+
+
+def head_revision() -> int:
+    """Последняя ревизия по именам файлов, без импорта самих миграций."""
+    modules = _revision_modules()
+    return modules[-1][0] if modules else 0
+
+
+def load_migrations() -> List[Migration]:
+    return [
+        Migration(
+            revision,
+            name,
+            importlib.import_module(f"{migrations.__name__}.{module}").upgrade,
+        )
+        for revision, name, module in _revision_modules()
+    ]
+
+
+async def current_revision(conn: AsyncConnection) -> Optional[int]:
+    """Ревизия базы; None, если миграции на ней еще не запускались."""
+    try:
+        return await conn.scalar(select(func.max(schema_revision.c.revision)))
+    except DBAPIError:
+        # таблицы schema_revision нет
+        await conn.rollback()
+        return None
+
+
+async def check_schema_revision(engine: AsyncEngine) -> int:
+    """
+    Проверка при старте воркера: один SELECT вместо отражения схемы.
+    База новее кода допустима (миграции выкатываются раньше кода),
+    старее - нет.
+    """
+    head = head_revision()
+    async with engine.connect() as conn:
+        current = await current_revision(conn)
+    if current is None or current < head:
+        raise SchemaRevisionError(
+            f"Ревизия схемы {current}, код ждет {head}: "
+            "запустите python -m scripts.migrate"
+        )
+    if current > head:
+        logger.warning("Ревизия схемы %s новее кода (%s)", current, head)
+    return current
+
+
+async def upgrade(engine: AsyncEngine, target: Optional[int] = None) -> List[int]:
+    """Применяет недостающие миграции до target (по умолчанию до последней)."""
+    async with engine.begin() as conn:
+        await conn.run_sync(schema_revision.create, checkfirst=True)
+    applied = []
+    for migration in load_migrations():
+        if target is not None and migration.revision > target:
+            break
+        async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                await conn.execute(
+                    text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+                )
+            current = await current_revision(conn) or 0
+            if migration.revision <= current:
+                continue
+            logger.info("Миграция %04d %s", migration.revision, migration.name)
+            await migration.upgrade(conn)
+            await conn.execute(
+                insert(schema_revision).values(
+                    revision=migration.revision, name=migration.name
+                )
+            )
+        applied.append(migration.revision)
+    return applied
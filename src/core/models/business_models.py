@@ -2,8 +2,18 @@ import uuid
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID as UUIDType
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID as UUIDType
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -16,6 +26,7 @@ from core.models.business_enums import (
     ServiceType,
     TenderStatus,
 )
+from core.search import FullTextSearch
 
 
 class Employee(Base):
@@ -38,6 +49,14 @@ class Organization(Base):
 
 class OrganizationResponsible(Base):
     __tablename__ = "organization_responsible"
+    __table_args__ = (
+        Index(
+            "ix_organization_responsible_organization_id_user_id",
+            "organization_id",
+            "user_id",
+        ),
+        Index("ix_organization_responsible_user_id", "user_id"),
+    )
 
     organization_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("organization.id"), nullable=False
@@ -49,6 +68,16 @@ class OrganizationResponsible(Base):
 
 class Tender(Base):
     __tablename__ = "tender"
+    __table_args__ = (
+        Index("ix_tender_service_type_name", "service_type", "name", "id"),
+        Index("ix_tender_creator_username_name", "creator_username", "name", "id"),
+        Index("ix_tender_organization_id_name", "organization_id", "name", "id"),
+        # список без service_type: порядок страницы берется из индекса
+        Index("ix_tender_name", "name", "id"),
+        # фильтры status и created_from/created_to без service_type
+        Index("ix_tender_status_name", "status", "name", "id"),
+        Index("ix_tender_created_at", "created_at"),
+    )
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=True)
     service_type: Mapped["ServiceType"] = mapped_column(
@@ -70,31 +99,34 @@ class Tender(Base):
         return f"<Tender(id={self.id}, name={self.name}, status={self.status})>"
 
 
-class TenderHistory(Base):
-    __tablename__ = "tender_history"
-    refer_tender_id: Mapped[str] = mapped_column(
-        ForeignKey("tender.id"), nullable=False
-    )
-    name: Mapped[str] = mapped_column(String, nullable=False)
-    description: Mapped[str] = mapped_column(String, nullable=True)
-    service_type: Mapped["ServiceType"] = mapped_column(
-        Enum(ServiceType), nullable=False
-    )
-    status: Mapped["TenderStatus"] = mapped_column(Enum(TenderStatus), nullable=False)
-    version: Mapped[int] = mapped_column(
-        Integer, default=1, nullable=False, autoincrement=True
+class TenderRevision(Base):
+    """
+    Прошлая версия тендера: поля, отличавшиеся от следующей версии,
+    либо полный снимок для каждой history.snapshot_every версии.
+    """
+
+    __tablename__ = "tender_revision"
+    __table_args__ = (
+        Index(
+            "ix_tender_revision_tender_id_version", "tender_id", "version", unique=True
+        ),
     )
-    organization_id: Mapped[str] = mapped_column(
-        ForeignKey("organization.id"), nullable=False
+    tender_id: Mapped[UUID] = mapped_column(ForeignKey("tender.id"), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_snapshot: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    changes: Mapped[dict] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=False
     )
-    creator_username: Mapped[str] = mapped_column(
-        String, ForeignKey("employee.username"), nullable=False
-    )
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
 
 
 class Bid(Base):
     __tablename__ = "bid"
+    __table_args__ = (
+        Index("ix_bid_author_id_name", "author_id", "name", "id"),
+        Index(
+            "ix_bid_tender_id_author_id_name", "tender_id", "author_id", "name", "id"
+        ),
+    )
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[str] = mapped_column(
         String,
@@ -110,8 +142,24 @@ class Bid(Base):
     )
 
 
+class BidRevision(Base):
+    """Прошлая версия предложения, устроена как TenderRevision."""
+
+    __tablename__ = "bid_revision"
+    __table_args__ = (
+        Index("ix_bid_revision_bid_id_version", "bid_id", "version", unique=True),
+    )
+    bid_id: Mapped[UUID] = mapped_column(ForeignKey("bid.id"), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_snapshot: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    changes: Mapped[dict] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=False
+    )
+
+
 class Decision(Base):
     __tablename__ = "decision"
+    __table_args__ = (Index("ix_decision_bid_id", "bid_id"),)
 
     bid_id: Mapped[str] = mapped_column(ForeignKey("bid.id"), nullable=False)
     user_id: Mapped[str] = mapped_column(ForeignKey("employee.id"), nullable=False)
@@ -120,9 +168,27 @@ class Decision(Base):
     )
 
 
+class BidDecisionTally(Base):
+    """Счетчики решений по предложению, обновляются при каждом голосе."""
+
+    __tablename__ = "bid_decision_tally"
+
+    bid_id: Mapped[UUID] = mapped_column(
+        ForeignKey("bid.id"), unique=True, nullable=False
+    )
+    approved_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rejected_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    quorum_target: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
 class Review(Base):
     description: Mapped[str] = mapped_column(String, nullable=False)
     bid_id: Mapped[UUID] = mapped_column(ForeignKey("bid.id"), nullable=False)
     reviewer_id: Mapped[UUID] = mapped_column(
         ForeignKey("employee.id"), nullable=False
     )  # Assuming a User model exists
+
+
+# Колонка search_vector и GIN-индекс создаются только на PostgreSQL
+tender_search = FullTextSearch(Tender, {"name": "A", "description": "B"})
+bid_search = FullTextSearch(Bid, {"name": "A", "description": "B"})
@@ -1,49 +1,175 @@
-from typing import AsyncGenerator
+from itertools import cycle
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence
 
+from core.cache import MISSING, TTLCache
 from core.config import settings
+from core.models.pool import InstrumentedAsyncPool
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+
+
+def _engine_kwargs(
+    url: str,
+    pool_size: int,
+    max_overflow: int,
+    pool_pre_ping: bool,
+    pool_recycle: int,
+    pool_timeout: float,
+    pool_use_lifo: bool,
+    statement_cache_size: int,
+) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"pool_pre_ping": pool_pre_ping}
+    if url.startswith("postgresql+asyncpg"):
+        kwargs["connect_args"] = {"prepared_statement_cache_size": statement_cache_size}
+    # SQLite в памяти живет в одном соединении, пул очередей ему не подходит
+    if not (url.startswith("sqlite") and ":memory:" in url):
+        kwargs.update(
+            poolclass=InstrumentedAsyncPool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=pool_recycle,
+            pool_timeout=pool_timeout,
+            pool_use_lifo=pool_use_lifo,
+        )
+    return kwargs
+
+
+class TrackingSession(Session):
+    """Сессия, которая помечает в info, что через нее что-то записывалось."""
+
+
+@event.listens_for(TrackingSession, "after_flush")
+def _mark_flush(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(TrackingSession, "do_orm_execute")
+def _mark_dml(orm_execute_state) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+def _writer_key(request: Request) -> Optional[str]:
+    return request.query_params.get("username")
 
 
 class DatabaseHelper:
     def __init__(
-            self,
-            url: str,
-            echo: bool = False,
-            echo_pool: bool = False,
-            pool_size: int = 0,
-            max_overflow: int = 10,
+        self,
+        url: str,
+        replica_urls: Sequence[str] = (),
+        read_your_writes_window: float = 5.0,
+        echo: bool = False,
+        echo_pool: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_pre_ping: bool = True,
+        pool_recycle: int = 1800,
+        pool_timeout: float = 30.0,
+        pool_use_lifo: bool = True,
+        statement_cache_size: int = 100,
     ) -> None:
-        self.engine: AsyncEngine = create_async_engine(
-            url=url,
+        engine_options = dict(
             echo=echo,
             echo_pool=echo_pool,
             pool_size=pool_size,
             max_overflow=max_overflow,
+            pool_pre_ping=pool_pre_ping,
+            pool_recycle=pool_recycle,
+            pool_timeout=pool_timeout,
+            pool_use_lifo=pool_use_lifo,
+            statement_cache_size=statement_cache_size,
+        )
+        self.engine: AsyncEngine = self._create_engine(url, **engine_options)
+        self.session_factory = self._create_session_factory(self.engine)
+        self.replica_engines: List[AsyncEngine] = [
+            self._create_engine(replica_url, **engine_options)
+            for replica_url in replica_urls
+        ]
+        self._replica_session_factories = cycle(
+            [self._create_session_factory(engine) for engine in self.replica_engines]
+            or [self.session_factory]
+        )
+        # username -> недавно писал; такие чтения идут в первичную базу
+        self._recent_writers = TTLCache(maxsize=100_000, ttl=read_your_writes_window)
+
+    @staticmethod
+    def _create_engine(url: str, echo: bool, echo_pool: bool, **options) -> AsyncEngine:
+        return create_async_engine(
+            url=url, echo=echo, echo_pool=echo_pool, **_engine_kwargs(url, **options)
         )
-        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            bind=self.engine,
+
+    @staticmethod
+    def _create_session_factory(
+        engine: AsyncEngine,
+    ) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(
+            bind=engine,
+            sync_session_class=TrackingSession,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
 
+    @property
+    def engines(self) -> List[AsyncEngine]:
+        return [self.engine, *self.replica_engines]
+
     async def dispose(self) -> None:
-        await self.engine.dispose()
+        for engine in self.engines:
+            await engine.dispose()
 
-    async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
+    def mark_write(self, writer: Optional[str]) -> None:
+        if writer is not None:
+            self._recent_writers.set(writer, True)
+
+    def wrote_recently(self, writer: Optional[str]) -> bool:
+        if writer is None:
+            return False
+        return self._recent_writers.get(writer) is not MISSING
+
+    def read_session_factory(
+        self, writer: Optional[str] = None
+    ) -> async_sessionmaker[AsyncSession]:
+        """Фабрика сессий реплики по кругу или первичной, если writer недавно писал."""
+        if not self.replica_engines or self.wrote_recently(writer):
+            return self.session_factory
+        return next(self._replica_session_factories)
+
+    async def session_getter(
+        self, request: Request
+    ) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             yield session
+            if session.info.get("has_writes"):
+                self.mark_write(_writer_key(request))
+
+    async def read_session_getter(
+        self, request: Request
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """Сессия только для чтения: реплика с откатом на первичную после записи."""
+        async with self.read_session_factory(_writer_key(request))() as session:
+            yield session
 
 
 database_helper = DatabaseHelper(
     url=str(settings.database_url),
+    replica_urls=settings.db_config.replica_urls,
+    read_your_writes_window=settings.db_config.read_your_writes_window,
     echo=settings.db_config.echo,
     echo_pool=settings.db_config.echo_pool,
     pool_size=settings.db_config.pool_size,
     max_overflow=settings.db_config.max_overflow,
+    pool_pre_ping=settings.db_config.pool_pre_ping,
+    pool_recycle=settings.db_config.pool_recycle,
+    pool_timeout=settings.db_config.pool_timeout,
+    pool_use_lifo=settings.db_config.pool_use_lifo,
+    statement_cache_size=settings.db_config.statement_cache_size,
 )
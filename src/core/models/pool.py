@@ -0,0 +1,45 @@
+import os
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from core.metrics import Histogram
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Пул, который меряет время ожидания соединения и считает таймауты."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram()
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_time.observe(time.perf_counter() - start)
+
+
+def pool_status(engine: AsyncEngine) -> Dict[str, Any]:
+    """Состояние пула текущего воркера."""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pid": os.getpid(), "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+        )
+    if isinstance(pool, InstrumentedAsyncPool):
+        status.update(timeouts=pool.timeouts, wait_time=pool.wait_time.snapshot())
+    return status
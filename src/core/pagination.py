@@ -0,0 +1,142 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence
+from uuid import UUID
+
+from fastapi import Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+import consts
+
+
+class Cursor(NamedTuple):
+    key: Any
+    id: UUID
+
+
+def encode_cursor(key: Any, row_id: UUID) -> str:
+    if isinstance(key, datetime):
+        payload = ["dt", key.isoformat(), str(row_id)]
+    else:
+        payload = ["s", key, str(row_id)]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Разбирает непрозрачный токен курсора, ValueError если он поврежден."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        kind, key, row_id = json.loads(raw)
+        if kind == "dt":
+            key = datetime.fromisoformat(key)
+        elif kind != "s":
+            raise ValueError(kind)
+        return Cursor(key=key, id=UUID(row_id))
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise ValueError(consts.INVALID_CURSOR_CONTENT) from exc
+
+
+def _invalid_cursor() -> RequestValidationError:
+    return RequestValidationError(
+        [
+            {
+                "loc": ("query", "cursor"),
+                "msg": consts.INVALID_CURSOR_CONTENT,
+                "type": "value_error",
+            }
+        ]
+    )
+
+
+async def cursor_query(
+    cursor: Optional[str] = Query(
+        default=None, description="Курсор следующей страницы из заголовка Link"
+    ),
+) -> Optional[Cursor]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as exc:
+        raise _invalid_cursor() from exc
+
+
+def typed_cursor_query(*key_types: type) -> Callable[..., Any]:
+    """
+    Зависимость курсора списка с ключом типа key_types: курсор чужого
+    списка (имя вместо номера версии и т. п.) - 400, а не ошибка базы.
+    """
+
+    async def dependency(
+        cursor: Optional[Cursor] = Depends(cursor_query),
+    ) -> Optional[Cursor]:
+        if cursor is not None and (
+            isinstance(cursor.key, bool) or not isinstance(cursor.key, key_types)
+        ):
+            raise _invalid_cursor()
+        return cursor
+
+    return dependency
+
+
+# списки по (name, id)
+name_cursor_query = typed_cursor_query(str)
+# история версий по (version, id)
+version_cursor_query = typed_cursor_query(int)
+
+
+def paginate(
+    stmt: Select,
+    key_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    limit: int,
+    offset: int,
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    """
+    Упорядочивает выборку по (key, id) и режет страницу с одной строкой
+    сверх limit: по ней видно, есть ли следующая страница.
+    С курсором страница ищется по индексу, offset игнорируется.
+    """
+    stmt = stmt.order_by(key_column, id_column).limit(limit + 1)
+    if cursor is None:
+        return stmt.offset(offset)
+    return stmt.where(tuple_(key_column, id_column) > (cursor.key, cursor.id))
+
+
+def next_page_token(rows: Sequence[Any], key_attr: str, limit: int) -> Optional[str]:
+    """
+    Курсор следующей страницы, если за ней есть строки: rows выбраны
+    с одной строкой сверх limit (paginate).
+    """
+    if limit == 0 or len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(getattr(last, key_attr), last.id)
+
+
+def next_page_headers(request: Request, token: Optional[str]) -> Dict[str, str]:
+    """X-Next-Cursor и Link: rel="next" для курсора token."""
+    if token is None:
+        return {}
+    next_url = request.url.remove_query_params("offset").include_query_params(
+        cursor=token
+    )
+    return {"X-Next-Cursor": token, "Link": f'<{next_url}>; rel="next"'}
+
+
+def set_next_page_headers(
+    request: Request, response: Response, rows: Sequence[Any], key_attr: str, limit: int
+) -> Sequence[Any]:
+    """
+    Выставляет X-Next-Cursor и Link: rel="next", если есть следующая
+    страница, и возвращает строки страницы без лишней.
+    """
+    token = next_page_token(rows, key_attr, limit)
+    response.headers.update(next_page_headers(request, token))
+    return rows[:limit]
@@ -0,0 +1,410 @@
+"""
+Метрики в текстовом формате Prometheus для GET /metrics.
+
+MetricsMiddleware считает запросы по маршруту и статусу, задержку,
+запросы в работе и ответы-ошибки по классу BaseErrorResponse. Наборы
+меток маршрутов создаются один раз при старте (HttpMetrics.prepare),
+на запрос остаются поиск в словаре и несколько сложений.
+
+Несколько воркеров: с METRICS={"multiprocess_dir": "/tmp/metrics"} каждый
+воркер раз в flush_interval секунд пишет свое состояние в <pid>.json,
+а /metrics складывает счетчики и гистограммы всех файлов. Датчики
+(запросы в работе, пул) идут с меткой pid и только от воркеров, которые
+писали недавно. Файлы завершившихся воркеров /metrics сворачивает в
+aggregate.json, чтобы каталог не рос с каждым перезапуском воркера.
+Каталог очищает перед запуском воркеров python -m server.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from sqlalchemy.pool import QueuePool
+
+from core.config import settings
+from core.metrics import LATENCY_BUCKETS, Histogram
+from core.models.db_helper import DatabaseHelper, database_helper
+from core.models.pool import InstrumentedAsyncPool
+from core.query_stats import STATEMENT_BUCKETS, RouteQueryMetrics, route_query_metrics
+
+logger = logging.getLogger(__name__)
+
+# счетчик или гистограмма: корзины без накопления, последним - сумма
+Sample = Union[float, List[float]]
+
+# счетчики и гистограммы завершившихся воркеров
+AGGREGATE_FILE = "aggregate.json"
+
+
+def _histogram_sample(histogram: Histogram) -> List[float]:
+    return [*histogram.counts, histogram.sum]
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricFamilies:
+    """Семейства метрик: имя -> тип, описание, корзины и значения по меткам."""
+
+    def __init__(self, families: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self.families: Dict[str, Dict[str, Any]] = families or {}
+
+    def declare(
+        self,
+        name: str,
+        kind: str,
+        description: str,
+        buckets: Optional[Sequence[float]] = None,
+    ) -> None:
+        self.families.setdefault(
+            name,
+            {
+                "type": kind,
+                "help": description,
+                "buckets": list(buckets) if buckets is not None else None,
+                "samples": {},
+            },
+        )
+
+    def add(self, name: str, labels: str, value: Sample) -> None:
+        samples = self.families[name]["samples"]
+        current = samples.get(labels)
+        if current is None:
+            samples[labels] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            samples[labels] = [left + right for left, right in zip(current, value)]
+        else:
+            samples[labels] = current + value
+
+    def merge(self, other: "MetricFamilies", with_gauges: bool) -> None:
+        for name, family in other.families.items():
+            if family["type"] == "gauge" and not with_gauges:
+                continue
+            self.declare(name, family["type"], family["help"], family["buckets"])
+            for labels, value in family["samples"].items():
+                self.add(name, labels, value)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, family in sorted(self.families.items()):
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for labels, value in family["samples"].items():
+                if family["type"] == "histogram":
+                    lines += _histogram_lines(name, labels, family["buckets"], value)
+                else:
+                    lines.append(f"{name}{_braces(labels)} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _braces(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+def _histogram_lines(
+    name: str, labels: str, buckets: Sequence[float], value: List[float]
+) -> List[str]:
+    prefix = f"{labels}," if labels else ""
+    lines, total = [], 0.0
+    for bound, count in zip([*map(str, buckets), "+Inf"], value[:-1]):
+        total += count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {_format_number(total)}')
+    lines.append(f"{name}_sum{_braces(labels)} {_format_number(value[-1])}")
+    lines.append(f"{name}_count{_braces(labels)} {_format_number(total)}")
+    return lines
+
+
+class RouteMetrics:
+    __slots__ = ("labels", "statuses", "latency", "errors")
+
+    def __init__(self, labels: str) -> None:
+        self.labels = labels
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram()
+        self.errors: Dict[str, int] = {}
+
+
+def _route_labels(method: str, path: str) -> str:
+    return f'method="{method}",route="{path}"'
+
+
+class HttpMetrics:
+    """Метрики HTTP-запросов воркера по шаблонам маршрутов."""
+
+    def __init__(self) -> None:
+        # (id маршрута, метод) -> метрики; маршруты живут все время работы
+        self.routes: Dict[tuple, RouteMetrics] = {}
+        self.unmatched = RouteMetrics(_route_labels("", "unmatched"))
+        self.in_flight = 0
+
+    def prepare(self, routes: Iterable[Any]) -> None:
+        # один набор меток на пару метод-путь, даже если роутер подключен дважды
+        by_labels: Dict[str, RouteMetrics] = {}
+        for route in routes:
+            for method in sorted(getattr(route, "methods", None) or ()):
+                labels = _route_labels(method, route.path)
+                metrics = by_labels.setdefault(labels, RouteMetrics(labels))
+                self.routes[(id(route), method)] = metrics
+
+    def observe(self, scope: Dict[str, Any], status: int, elapsed: float) -> None:
+        # неизвестный метод или путь не порождают новых меток
+        metrics = self.routes.get((id(scope.get("route")), scope["method"]))
+        if metrics is None:
+            metrics = self.unmatched
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.latency.observe(elapsed)
+        error = scope.get("error_response")
+        if error is not None:
+            metrics.errors[error] = metrics.errors.get(error, 0) + 1
+
+    def collect(self, families: MetricFamilies, pid: str) -> None:
+        families.declare(
+            "http_requests_total", "counter", "Запросы по маршруту и статусу"
+        )
+        families.declare(
+            "http_request_duration_seconds",
+            "histogram",
+            "Время обработки запроса",
+            LATENCY_BUCKETS,
+        )
+        families.declare(
+            "http_error_responses_total",
+            "counter",
+            "Ответы-ошибки по классу BaseErrorResponse",
+        )
+        families.declare("http_requests_in_flight", "gauge", "Запросы в работе")
+        seen = set()
+        for metrics in [*self.routes.values(), self.unmatched]:
+            if id(metrics) in seen:
+                continue
+            seen.add(id(metrics))
+            for status, count in metrics.statuses.items():
+                families.add(
+                    "http_requests_total", f'{metrics.labels},status="{status}"', count
+                )
+            families.add(
+                "http_request_duration_seconds",
+                metrics.labels,
+                _histogram_sample(metrics.latency),
+            )
+            for error, count in metrics.errors.items():
+                families.add(
+                    "http_error_responses_total",
+                    f'{metrics.labels},error="{error}"',
+                    count,
+                )
+        families.add("http_requests_in_flight", f'pid="{pid}"', self.in_flight)
+
+
+http_metrics = HttpMetrics()
+
+
+class MetricsMiddleware:
+    def __init__(self, app, metrics: HttpMetrics = http_metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe(scope, status, time.perf_counter() - started)
+
+
+def collect_pools(families: MetricFamilies, helper: DatabaseHelper, pid: str) -> None:
+    families.declare("db_pool_size", "gauge", "Размер пула соединений")
+    families.declare("db_pool_checked_out", "gauge", "Выданные из пула соединения")
+    families.declare("db_pool_overflow", "gauge", "Соединения сверх pool_size")
+    families.declare(
+        "db_pool_timeouts_total", "counter", "Таймауты ожидания соединения"
+    )
+    families.declare(
+        "db_pool_wait_seconds",
+        "histogram",
+        "Ожидание соединения из пула",
+        LATENCY_BUCKETS,
+    )
+    engines = {"primary": helper.engine}
+    for number, engine in enumerate(helper.replica_engines):
+        engines[f"replica{number}"] = engine
+    for name, engine in engines.items():
+        pool = engine.pool
+        labels = f'engine="{name}"'
+        if isinstance(pool, QueuePool):
+            gauge_labels = f'{labels},pid="{pid}"'
+            families.add("db_pool_size", gauge_labels, pool.size())
+            families.add("db_pool_checked_out", gauge_labels, pool.checkedout())
+            families.add("db_pool_overflow", gauge_labels, max(0, pool.overflow()))
+        if isinstance(pool, InstrumentedAsyncPool):
+            families.add("db_pool_timeouts_total", labels, pool.timeouts)
+            families.add(
+                "db_pool_wait_seconds", labels, _histogram_sample(pool.wait_time)
+            )
+
+
+def collect_queries(families: MetricFamilies, queries: RouteQueryMetrics) -> None:
+    families.declare(
+        "db_statements_per_request",
+        "histogram",
+        "SQL-запросы на HTTP-запрос",
+        STATEMENT_BUCKETS,
+    )
+    families.declare(
+        "db_time_per_request_seconds",
+        "histogram",
+        "Время в базе на HTTP-запрос",
+        LATENCY_BUCKETS,
+    )
+    for route, (statements, db_time) in queries.routes.items():
+        method, _, path = route.rpartition(" ")
+        labels = _route_labels(method, path)
+        families.add("db_statements_per_request", labels, _histogram_sample(statements))
+        families.add("db_time_per_request_seconds", labels, _histogram_sample(db_time))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsExporter:
+    def __init__(
+        self,
+        http: HttpMetrics,
+        queries: RouteQueryMetrics,
+        helper: DatabaseHelper,
+        multiprocess_dir: Optional[str] = None,
+        flush_interval: float = 5.0,
+    ) -> None:
+        self.http = http
+        self.queries = queries
+        self.helper = helper
+        self.directory = Path(multiprocess_dir) if multiprocess_dir else None
+        self.flush_interval = flush_interval
+
+    def collect(self) -> MetricFamilies:
+        families = MetricFamilies()
+        pid = str(os.getpid())
+        self.http.collect(families, pid)
+        collect_pools(families, self.helper, pid)
+        collect_queries(families, self.queries)
+        return families
+
+    def _own_file(self) -> Path:
+        return self.directory / f"{os.getpid()}.json"
+
+    def flush(self) -> None:
+        """Пишет состояние воркера в свой файл атомарной заменой."""
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self._own_file().with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.collect().families))
+        os.replace(tmp, self._own_file())
+
+    async def flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Не удалось записать метрики воркера")
+
+    def _fold_dead_workers(self) -> None:
+        """
+        Переносит счетчики из файлов завершившихся воркеров в AGGREGATE_FILE
+        и удаляет эти файлы. Воркеры делают это под общей блокировкой,
+        чтобы один файл не сложился дважды.
+        """
+        dead = [
+            path
+            for path in self.directory.glob("*.json")
+            if path.stem.isdigit() and not _pid_alive(int(path.stem))
+        ]
+        if not dead:
+            return
+        import fcntl
+
+        with open(self.directory / "aggregate.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            aggregate_path = self.directory / AGGREGATE_FILE
+            try:
+                aggregate = MetricFamilies(json.loads(aggregate_path.read_text()))
+            except FileNotFoundError:
+                aggregate = MetricFamilies()
+            folded = []
+            for path in dead:
+                try:
+                    state = json.loads(path.read_text())
+                except FileNotFoundError:
+                    # уже свернул другой воркер
+                    continue
+                except ValueError:
+                    logger.warning("Файл метрик %s поврежден и удален", path.name)
+                else:
+                    aggregate.merge(MetricFamilies(state), with_gauges=False)
+                folded.append(path)
+            if not folded:
+                return
+            tmp = aggregate_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(aggregate.families))
+            os.replace(tmp, aggregate_path)
+            for path in folded:
+                path.unlink(missing_ok=True)
+
+    def render(self) -> str:
+        families = self.collect()
+        if self.directory is None:
+            return families.render()
+        try:
+            self._fold_dead_workers()
+        except OSError:
+            logger.exception("Не удалось свернуть метрики завершившихся воркеров")
+        merged = MetricFamilies()
+        merged.merge(families, with_gauges=True)
+        fresh_after = time.time() - 3 * self.flush_interval
+        own = self._own_file()
+        for path in self.directory.glob("*.json"):
+            if path == own:
+                continue
+            try:
+                state = json.loads(path.read_text())
+                modified = path.stat().st_mtime
+            except (OSError, ValueError):
+                # файл умершего воркера удалили или он дописывается
+                continue
+            merged.merge(MetricFamilies(state), with_gauges=modified >= fresh_after)
+        return merged.render()
+
+
+metrics_exporter = MetricsExporter(
+    http_metrics,
+    route_query_metrics,
+    database_helper,
+    multiprocess_dir=settings.metrics.multiprocess_dir,
+    flush_interval=settings.metrics.flush_interval,
+)
@@ -0,0 +1,186 @@
+"""
+Счетчик SQL-запросов на HTTP-запрос.
+
+Хуки before/after_cursor_execute движков меряют каждый запрос и пишут его
+в статистику текущего HTTP-запроса (contextvar, который ставит
+QueryStatsMiddleware). По маршрутам копятся гистограммы числа запросов
+и времени в базе, запросы дольше порога с выборкой идут в лог медленных.
+"""
+
+import hashlib
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%\(\w+\)s|:\w+|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> Tuple[str, str]:
+    """
+    Нормализованный текст и короткий хэш: литералы и параметры заменены
+    на ?, списки IN любой длины схлопнуты, чтобы один запрос с разными
+    значениями давал один отпечаток.
+    """
+    normalized = _STRING_RE.sub("?", statement)
+    normalized = _PLACEHOLDER_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("(...)", normalized)
+    normalized = _SPACE_RE.sub(" ", normalized).strip()
+    digest = hashlib.blake2b(normalized.encode(), digest_size=6).hexdigest()
+    return digest, normalized
+
+
+class QueryStats:
+    """Запросы одного HTTP-запроса."""
+
+    __slots__ = ("scope", "count", "total_time", "slowest_time", "slowest_statement")
+
+    def __init__(self, scope: Dict[str, Any]) -> None:
+        self.scope = scope
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    @property
+    def route(self) -> str:
+        # шаблон пути, а не сам путь: id в адресе не плодят гистограммы,
+        # как и произвольные методы
+        route = self.scope.get("route")
+        method = self.scope["method"]
+        if method not in (getattr(route, "methods", None) or ()):
+            return "unmatched"
+        return f"{method} {route.path}"
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-DB-Statements": str(self.count),
+            "X-DB-Time-Ms": f"{self.total_time * 1000:.2f}",
+        }
+        if self.slowest_statement is not None:
+            digest, _ = fingerprint(self.slowest_statement)
+            headers["X-DB-Slowest"] = f"{digest}; dur={self.slowest_time * 1000:.2f}"
+        return headers
+
+
+current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+class RouteQueryMetrics:
+    """Гистограммы числа запросов и времени в базе по шаблонам маршрутов."""
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, Tuple[Histogram, Histogram]] = {}
+
+    def observe(self, route: str, stats: QueryStats) -> None:
+        histograms = self.routes.get(route)
+        if histograms is None:
+            histograms = (Histogram(STATEMENT_BUCKETS), Histogram())
+            self.routes[route] = histograms
+        statements, db_time = histograms
+        statements.observe(stats.count)
+        db_time.observe(stats.total_time)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            route: {"statements": statements.snapshot(), "db_time": db_time.snapshot()}
+            for route, (statements, db_time) in sorted(self.routes.items())
+        }
+
+
+route_query_metrics = RouteQueryMetrics()
+
+
+class QueryStatsInstrumentation:
+    def __init__(self, slow_threshold: float, slow_sample_rate: float) -> None:
+        self.slow_threshold = slow_threshold
+        self.slow_sample_rate = slow_sample_rate
+
+    def instrument(self, engines: Iterable[AsyncEngine]) -> None:
+        for engine in engines:
+            sync_engine = engine.sync_engine
+            if not event.contains(sync_engine, "after_cursor_execute", self._after):
+                event.listen(sync_engine, "before_cursor_execute", self._before)
+                event.listen(sync_engine, "after_cursor_execute", self._after)
+
+    @staticmethod
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        # контекст свой у каждого выполнения, при ошибке отметка не копится
+        context._query_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context._query_started
+        stats = current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        if elapsed >= self.slow_threshold and random.random() < self.slow_sample_rate:
+            digest, normalized = fingerprint(statement)
+            logger.warning(
+                "Медленный запрос %.1f ms [%s] %s: %s",
+                elapsed * 1000,
+                digest,
+                stats.route if stats is not None else "-",
+                normalized[:1000],
+            )
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI-обертка: статистика запросов на время HTTP-запроса, гистограммы
+    по маршруту после ответа, заголовки X-DB-* при debug_headers. Заголовки
+    уходят в начале ответа, запросы потоковой выгрузки после него в них
+    не попадают.
+    """
+
+    def __init__(self, app, debug_headers: bool = False) -> None:
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats(scope)
+        token = current_stats.set(stats)
+
+        async def send_with_stats(message) -> None:
+            if message["type"] == "http.response.start" and self.debug_headers:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    *(
+                        (name.lower().encode(), value.encode())
+                        for name, value in stats.headers().items()
+                    ),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_stats.reset(token)
+            route_query_metrics.observe(stats.route, stats)
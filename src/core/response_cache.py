@@ -0,0 +1,252 @@
+"""
+Кэш готовых ответов: тело уже сериализовано в JSON-байты, заголовки рядом.
+
+Записи сгруппированы по пространствам имен, например страницы тендеров
+одного service_type. Запись сбрасывает пространство целиком, соседние
+остаются. Бэкенд - LRU в памяти воркера или общий Redis (hash на
+пространство, сброс одним DEL). Для тестов и бенчмарков без сервера
+Redis есть LocalRedis с тем же набором команд.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import orjson
+
+from core.cache import MISSING, TTLCache
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+
+    def dumps(self) -> bytes:
+        return orjson.dumps(self.headers) + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CachedResponse":
+        headers, body = raw.split(b"\n", 1)
+        return cls(body=body, headers=orjson.loads(headers))
+
+
+class ResponseCacheBackend(ABC):
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: bytes) -> None: ...
+
+    @abstractmethod
+    async def invalidate(self, namespace: str) -> None: ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class LRUResponseBackend(ResponseCacheBackend):
+    """
+    В памяти воркера. Сброс пространства - новое поколение в ключе,
+    старые записи вытесняются LRU. Другие воркеры сброс не видят и отдают
+    старую страницу до истечения ttl.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: Dict[str, int] = {}
+
+    def _key(self, namespace: str, key: str) -> Tuple[str, int, str]:
+        return namespace, self._generations.get(namespace, 0), key
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        value = self._entries.get(self._key(namespace, key))
+        return None if value is MISSING else value
+
+    async def set(self, namespace: str, key: str, value: bytes) -> None:
+        self._entries.set(self._key(namespace, key), value)
+
+    async def invalidate(self, namespace: str) -> None:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return self._entries.stats()
+
+
+class RedisResponseBackend(ResponseCacheBackend):
+    """
+    Общий для воркеров: пространство - hash, запись - поле. ttl ставится
+    на hash целиком и продлевается каждой записью, точный сброс - DEL.
+    client - redis.asyncio.Redis или LocalRedis.
+    """
+
+    def __init__(self, client: Any, ttl: float, prefix: str = "response:") -> None:
+        self.client = client
+        self.ttl = max(1, int(ttl))
+        self.prefix = prefix
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return await self.client.hget(self.prefix + namespace, key)
+
+    async def set(self, namespace: str, key: str, value: bytes) -> None:
+        await self.client.hset(self.prefix + namespace, key, value)
+        await self.client.expire(self.prefix + namespace, self.ttl)
+
+    async def invalidate(self, namespace: str) -> None:
+        await self.client.delete(self.prefix + namespace)
+
+
+class LocalRedis:
+    """Подмена redis.asyncio.Redis в памяти: только команды RedisResponseBackend."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._hashes: Dict[str, Dict[str, bytes]] = {}
+        self._expires: Dict[str, float] = {}
+
+    def _live(self, name: str) -> Optional[Dict[str, bytes]]:
+        expires = self._expires.get(name)
+        if expires is not None and expires <= self._clock():
+            self._hashes.pop(name, None)
+            self._expires.pop(name, None)
+        return self._hashes.get(name)
+
+    async def hget(self, name: str, key: str) -> Optional[bytes]:
+        fields = self._live(name)
+        return None if fields is None else fields.get(key)
+
+    async def hset(self, name: str, key: str, value: bytes) -> int:
+        fields = self._live(name)
+        if fields is None:
+            fields = self._hashes[name] = {}
+        created = key not in fields
+        fields[key] = value
+        return int(created)
+
+    async def expire(self, name: str, seconds: int) -> bool:
+        if self._live(name) is None:
+            return False
+        self._expires[name] = self._clock() + seconds
+        return True
+
+    async def delete(self, *names: str) -> int:
+        deleted = 0
+        for name in names:
+            deleted += self._live(name) is not None
+            self._hashes.pop(name, None)
+            self._expires.pop(name, None)
+        return deleted
+
+
+class ResponseCache:
+    """
+    Параллельные промахи по одному ключу ждут единственную отрисовку.
+    Страница, отрисованная до сброса своего пространства, не сохраняется.
+    """
+
+    def __init__(self, backend: Optional[ResponseCacheBackend]) -> None:
+        # None - кэш выключен, каждая страница отрисовывается заново
+        self.backend = backend
+        self._rendering: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_render(
+        self,
+        namespace: str,
+        key: str,
+        render: Callable[[], Awaitable[CachedResponse]],
+    ) -> CachedResponse:
+        if self.backend is None:
+            return await render()
+        raw = await self.backend.get(namespace, key)
+        if raw is not None:
+            self.hits += 1
+            return CachedResponse.loads(raw)
+        self.misses += 1
+        if (pending := self._rendering.get((namespace, key))) is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._rendering[(namespace, key)] = future
+        generation = self._generations.get(namespace, 0)
+        try:
+            cached = await render()
+            if generation == self._generations.get(namespace, 0):
+                await self.backend.set(namespace, key, cached.dumps())
+        except BaseException as exc:
+            future.set_exception(exc)
+            # исключение уже проброшено вызывающему, ожидающих может не быть
+            future.exception()
+            raise
+        else:
+            future.set_result(cached)
+            return cached
+        finally:
+            del self._rendering[(namespace, key)]
+
+    async def get_or_render_many(
+        self,
+        namespaces: Sequence[str],
+        key: str,
+        render: Callable[[List[str]], Awaitable[Dict[str, CachedResponse]]],
+    ) -> Dict[str, CachedResponse]:
+        """
+        Записи key в нескольких пространствах: все промахи отрисовываются
+        одним вызовом render(пространства промахов). Без кэша render
+        получает все пространства.
+        """
+        if self.backend is None:
+            return await render(list(namespaces))
+        found: Dict[str, CachedResponse] = {}
+        missing: List[str] = []
+        for namespace in namespaces:
+            raw = await self.backend.get(namespace, key)
+            if raw is None:
+                missing.append(namespace)
+            else:
+                found[namespace] = CachedResponse.loads(raw)
+        self.hits += len(found)
+        self.misses += len(missing)
+        if missing:
+            generations = {name: self._generations.get(name, 0) for name in missing}
+            rendered = await render(missing)
+            for namespace, cached in rendered.items():
+                if generations[namespace] == self._generations.get(namespace, 0):
+                    await self.backend.set(namespace, key, cached.dumps())
+            found.update(rendered)
+        return found
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            if self.backend is not None:
+                await self.backend.invalidate(namespace)
+
+    def stats(self) -> Dict[str, Any]:
+        backend = self.backend.stats() if self.backend is not None else {}
+        return {**backend, "hits": self.hits, "misses": self.misses}
+
+
+def create_response_backend(config: Any) -> Optional[ResponseCacheBackend]:
+    if config.backend == "off":
+        return None
+    if config.backend == "redis":
+        # необязательная зависимость, нужна только для общего кэша
+        from redis.asyncio import Redis
+
+        return RedisResponseBackend(Redis.from_url(config.redis_url), config.ttl)
+    if config.backend == "local-redis":
+        return RedisResponseBackend(LocalRedis(), config.ttl)
+    return LRUResponseBackend(maxsize=config.maxsize, ttl=config.ttl)
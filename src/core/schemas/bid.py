@@ -62,3 +62,11 @@ class BidResponse(BaseModel):
 class BidUpdate(BaseModel):
     name: BidName
     description: BidDescription
+
+
+class BidDecisionSummary(BaseModel):
+    bid_id: BidID
+    approved_count: int = Field(0, description="Число решений Approved")
+    rejected_count: int = Field(0, description="Число решений Rejected")
+    quorum_target: int = Field(..., description="Сколько одобрений закрывает тендер")
+    quorum_reached: bool
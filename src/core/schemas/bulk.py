@@ -0,0 +1,20 @@
+from typing import Annotated, List
+
+from pydantic import BaseModel, Field
+
+RowIndex = Annotated[
+    int, Field(..., ge=0, description="Номер строки во входных данных")
+]
+RowErrorReason = Annotated[
+    str, Field(..., description="Причина, по которой строка не записана")
+]
+
+
+class BulkRowError(BaseModel):
+    index: RowIndex
+    reason: RowErrorReason
+
+
+class BulkImportResult(BaseModel):
+    inserted: int = 0
+    errors: List[BulkRowError] = []
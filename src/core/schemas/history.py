@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Annotated, Any, Dict
+
+from pydantic import BaseModel, ConfigDict, Field
+
+Version = Annotated[int, Field(..., ge=1, description="Номер версии")]
+
+
+class RevisionResponse(BaseModel):
+    version: Version
+    is_snapshot: bool = Field(..., description="Версия хранится целиком")
+    created_at: datetime = Field(..., description="Когда версия была заменена")
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FieldChange(BaseModel):
+    old: Any
+    new: Any
+
+
+class VersionDiff(BaseModel):
+    from_version: Version
+    to_version: Version
+    changes: Dict[str, FieldChange] = {}
+
+    @classmethod
+    def between(
+        cls,
+        from_version: int,
+        old: Dict[str, Any],
+        to_version: int,
+        new: Dict[str, Any],
+    ) -> "VersionDiff":
+        changes = {
+            name: FieldChange(old=old.get(name), new=value)
+            for name, value in new.items()
+            if old.get(name) != value
+        }
+        return cls(from_version=from_version, to_version=to_version, changes=changes)
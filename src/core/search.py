@@ -0,0 +1,224 @@
+"""
+Полнотекстовый поиск по текстовым колонкам модели.
+
+PostgreSQL: генерируемая колонка search_vector (tsvector) с GIN-индексом,
+база пересчитывает ее при каждом INSERT/UPDATE. Конфигурация russian
+стеммит кириллицу русским словарем, латиницу - english_stem. Каждое слово
+запроса ищется как префикс, слова объединяются через &, порядок -
+ts_rank_cd с весами колонок (A - 1.0, B - 0.4, C - 0.2, D - 0.1).
+
+SQLite (тесты): инвертированный индекс в памяти процесса с теми же
+весами, строится при первом поиске и обновляется из crud после коммита.
+Записи других процессов он не видит.
+"""
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    DDL,
+    ColumnElement,
+    Select,
+    and_,
+    case,
+    event,
+    false,
+    func,
+    literal_column,
+    or_,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.pagination import Cursor, typed_cursor_query
+
+SEARCH_CONFIG = "russian"
+RANK_WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+MAX_TERMS = 8
+
+WORD_RE = re.compile(r"\w+")
+
+
+def search_terms(text: Optional[str]) -> List[str]:
+    return WORD_RE.findall(text.lower()) if text else []
+
+
+class InMemorySearchIndex:
+    """Слово -> {id: вес}; словарь отсортирован для поиска по префиксу."""
+
+    def __init__(self, weights: Dict[str, float]) -> None:
+        self.weights = weights
+        self.ready = False
+        self._postings: Dict[str, Dict[UUID, float]] = defaultdict(dict)
+        self._documents: Dict[UUID, Set[str]] = {}
+        self._vocabulary: Optional[List[str]] = None
+
+    def put(self, doc_id: UUID, values: Dict[str, Optional[str]]) -> None:
+        self.remove(doc_id)
+        scores: Dict[str, float] = defaultdict(float)
+        for column, weight in self.weights.items():
+            for term in search_terms(values.get(column)):
+                scores[term] += weight
+        for term, score in scores.items():
+            self._postings[term][doc_id] = score
+        self._documents[doc_id] = set(scores)
+        self._vocabulary = None
+
+    def remove(self, doc_id: UUID) -> None:
+        for term in self._documents.pop(doc_id, ()):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary = None
+
+    def _words_with_prefix(self, prefix: str) -> Iterable[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect_left(self._vocabulary, prefix)
+        for word in self._vocabulary[start:]:
+            if not word.startswith(prefix):
+                break
+            yield word
+
+    def search(self, terms: List[str]) -> Dict[UUID, float]:
+        """Документы, где каждый term - префикс хотя бы одного слова."""
+        found: Optional[Dict[UUID, float]] = None
+        for term in terms:
+            scores: Dict[UUID, float] = defaultdict(float)
+            for word in self._words_with_prefix(term):
+                for doc_id, score in self._postings[word].items():
+                    scores[doc_id] += score
+            if found is None:
+                found = scores
+            else:
+                found = {
+                    doc_id: found[doc_id] + score
+                    for doc_id, score in scores.items()
+                    if doc_id in found
+                }
+            if not found:
+                return {}
+        return dict(found or {})
+
+
+class FullTextSearch:
+    """
+    Поиск по колонкам model с весами вида {"name": "A", "description": "B"}.
+    Колонка и индекс PostgreSQL создаются вместе с таблицей, на живой
+    базе - scripts.create_indexes.
+    """
+
+    def __init__(self, model: type, weights: Dict[str, str]) -> None:
+        self.model = model
+        self.table = model.__table__
+        self.weights = weights
+        self.index_name = f"ix_{self.table.name}_search_vector"
+        self.vector = literal_column(f"{self.table.name}.search_vector")
+        self.fallback = InMemorySearchIndex(
+            {column: RANK_WEIGHTS[weight] for column, weight in weights.items()}
+        )
+        for ddl in self.ddl(concurrently=False):
+            event.listen(
+                self.table, "after_create", ddl.execute_if(dialect="postgresql")
+            )
+        SEARCHABLE.append(self)
+
+    def _vector_expression(self) -> str:
+        return " || ".join(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), "
+            f"'{weight}')"
+            for column, weight in self.weights.items()
+        )
+
+    def ddl(self, concurrently: bool) -> List[DDL]:
+        """ALTER TABLE с генерируемой колонкой и GIN-индекс по ней."""
+        return [
+            DDL(
+                f"ALTER TABLE {self.table.name} ADD COLUMN IF NOT EXISTS "
+                f"search_vector tsvector GENERATED ALWAYS AS "
+                f"({self._vector_expression()}) STORED"
+            ),
+            DDL(
+                f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}"
+                f"IF NOT EXISTS {self.index_name} "
+                f"ON {self.table.name} USING gin (search_vector)"
+            ),
+        ]
+
+    def index(self, session: AsyncSession, obj: Any) -> None:
+        """Обновляет запасной индекс после коммита; на PostgreSQL ничего не делает."""
+        if self.fallback.ready and _is_sqlite(session):
+            self.fallback.put(
+                obj.id, {name: getattr(obj, name) for name in self.weights}
+            )
+
+    async def _load_fallback(self, session: AsyncSession) -> None:
+        columns = [self.table.c.id, *(self.table.c[name] for name in self.weights)]
+        for row in await session.execute(select(*columns)):
+            self.fallback.put(row.id, row._asdict())
+        self.fallback.ready = True
+
+    async def _match_and_rank(
+        self, session: AsyncSession, terms: List[str]
+    ) -> Tuple[ColumnElement, ColumnElement]:
+        if not _is_sqlite(session):
+            query = func.to_tsquery(
+                SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms)
+            )
+            return self.vector.op("@@")(query), func.ts_rank_cd(self.vector, query)
+        if not self.fallback.ready:
+            await self._load_fallback(session)
+        scores = self.fallback.search(terms)
+        if not scores:
+            return false(), literal_column("0.0")
+        model_id = self.model.id
+        return model_id.in_(scores), case(scores, value=model_id, else_=0.0)
+
+    async def search(
+        self,
+        session: AsyncSession,
+        columns: Iterable[ColumnElement],
+        text: str,
+        limit: int,
+        offset: int,
+        cursor: Optional[Cursor] = None,
+        where: Iterable[ColumnElement] = (),
+    ) -> List[Any]:
+        """
+        Строки columns плюс rank, от релевантных к менее релевантным.
+        Курсор - (rank, id) последней строки, offset с ним игнорируется.
+        Строк на одну больше limit, как в paginate.
+        """
+        terms = search_terms(text)[:MAX_TERMS]
+        if not terms:
+            return []
+        match, rank = await self._match_and_rank(session, terms)
+        model_id = self.model.id
+        stmt: Select = (
+            select(*columns, rank.label("rank"))
+            .where(match, *where)
+            .order_by(rank.desc(), model_id)
+            .limit(limit + 1)
+        )
+        if cursor is None:
+            stmt = stmt.offset(offset)
+        else:
+            stmt = stmt.where(
+                or_(rank < cursor.key, and_(rank == cursor.key, model_id > cursor.id))
+            )
+        return (await session.execute(stmt)).all()
+
+
+SEARCHABLE: List[FullTextSearch] = []
+
+
+def _is_sqlite(session: AsyncSession) -> bool:
+    return session.get_bind().dialect.name == "sqlite"
+
+
+# курсор выдачи поиска: ключ - ранг, курсор обычного списка не подходит
+rank_cursor_query = typed_cursor_query(int, float)
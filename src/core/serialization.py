@@ -0,0 +1,67 @@
+"""
+Быстрый путь списков: нужные колонки строками вместо ORM-объектов
+и сразу в байты через orjson, без from_attributes-валидации каждой строки.
+Формат совпадает с ответом по response_model: UUID и даты строками,
+перечисления значениями.
+"""
+
+from typing import Any, Optional, Sequence, Tuple
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+
+from core.etag import list_etag
+from core.pagination import next_page_headers, next_page_token
+
+
+class RowSerializer:
+    """
+    Схема ответа, разобранная один раз при импорте: колонки модели
+    под именами полей схемы плюс служебные extra, которые в ответ не идут
+    (например updated_at для ETag страницы).
+    """
+
+    def __init__(
+        self, model: type, schema: type[BaseModel], extra: Sequence[str] = ()
+    ) -> None:
+        self.fields: Tuple[str, ...] = tuple(schema.model_fields)
+        self.columns = [getattr(model, name) for name in (*self.fields, *extra)]
+
+    def select(self) -> Select:
+        return select(*self.columns)
+
+    def dumps(self, rows: Sequence[Any]) -> bytes:
+        fields = self.fields
+        # zip по полям схемы отбрасывает хвост extra
+        return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+
+class RawJSONResponse(Response):
+    """Тело уже сериализовано в JSON-байты."""
+
+    media_type = "application/json"
+
+
+def page_response(
+    request: Request,
+    serializer: RowSerializer,
+    rows: Sequence[Any],
+    limit: int,
+    key_attr: str = "name",
+    total: Optional[int] = None,
+) -> RawJSONResponse:
+    """
+    Страница списка с ETag, заголовками следующей страницы и X-Total-Count.
+    rows выбраны с одной строкой сверх limit; ETag считается по всем, как
+    page_etag по той же выборке, в тело идут первые limit.
+    """
+    token = next_page_token(rows, key_attr, limit)
+    headers = next_page_headers(request, token)
+    if total is None:
+        headers["ETag"] = list_etag(rows)
+    else:
+        headers["ETag"] = list_etag(rows, total)
+        headers["X-Total-Count"] = str(total)
+    return RawJSONResponse(serializer.dumps(rows[:limit]), headers=headers)
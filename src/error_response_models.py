@@ -14,6 +14,11 @@ class BaseErrorResponse(Response):
             media_type="application/json",
         )
 
+    async def __call__(self, scope, receive, send) -> None:
+        # класс ошибки для счетчиков /metrics
+        scope["error_response"] = type(self).__name__
+        await super().__call__(scope, receive, send)
+
     def __dump_content_info(self):
         try:
             data = json.dumps({"reason": self.content})
@@ -47,6 +52,18 @@ class BidNotExistErrorResponse(BaseErrorResponse):
         super().__init__(status_code=status.HTTP_404_NOT_FOUND, content=content)
 
 
+class VersionNotExistErrorResponse(BaseErrorResponse):
+    def __init__(self, content: str = consts.VERSION_NOT_FOUND_CONTENT):
+        super().__init__(status_code=status.HTTP_404_NOT_FOUND, content=content)
+
+
+class PreconditionFailedErrorResponse(BaseErrorResponse):
+    def __init__(self, content: str = consts.PRECONDITION_FAILED_CONTENT):
+        super().__init__(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, content=content
+        )
+
+
 class UserIsNotResponsibleForOrganizationErrorResponse(BaseErrorResponse):
     def __init__(
         self, content: str = consts.USER_IS_NOT_RESPONSIBLE_ORGANIZATION_CONTENT
@@ -67,3 +84,8 @@ class UserIsNotResponsibleForBidErrorResponse(BaseErrorResponse):
 class ForbiddenErrorResponse(BaseErrorResponse):
     def __init__(self, content: str = consts.FORBIDDEN_ACCESS_CONTENT):
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, content=content)
+
+
+class InternalAccessDeniedErrorResponse(BaseErrorResponse):
+    def __init__(self, content: str = consts.INTERNAL_ACCESS_DENIED_CONTENT):
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, content=content)
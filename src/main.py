@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -8,14 +9,24 @@ from fastapi.exceptions import RequestValidationError, ResponseValidationError
 from api import (
     bids_router,
     employee_router,
+    health_router,
+    internal_router,
+    metrics_router,
     organization_responsibles_router,
     organization_router,
     pong_router,
     tenders_router,
 )
-from core.models.base import Base
+from api.internal.dependices import InternalAccessDenied
+from core.health import drain, readiness_probe
+from core.migrations import SchemaRevisionError, check_schema_revision
 from core.models.db_helper import database_helper
-from error_response_models import BadRequestErrorResponse
+from core.prometheus import MetricsMiddleware, http_metrics, metrics_exporter
+from core.query_stats import QueryStatsInstrumentation, QueryStatsMiddleware
+from error_response_models import (
+    BadRequestErrorResponse,
+    InternalAccessDeniedErrorResponse,
+)
 from src.core.config import settings
 
 # Configure logging
@@ -29,14 +40,39 @@ logger = logging.getLogger("my_fastapi_app")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with database_helper.engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    try:
+        # схему меняет python -m scripts.migrate, здесь только сверка ревизии
+        await check_schema_revision(database_helper.engine)
+    except SchemaRevisionError:
+        await database_helper.dispose()
+        raise
+    flush_task = asyncio.create_task(metrics_exporter.flush_periodically())
     yield
+    # балансировщик видит 503 на /health/ready, пока дорабатывают начатые запросы
+    readiness_probe.shutting_down = True
+    if left := await drain(http_metrics, settings.health.drain_timeout):
+        logger.warning("Остановка с незавершенными запросами: %s", left)
+    flush_task.cancel()
+    metrics_exporter.flush()
     await database_helper.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
 
+QueryStatsInstrumentation(
+    slow_threshold=settings.query_stats.slow_threshold_ms / 1000,
+    slow_sample_rate=settings.query_stats.slow_sample_rate,
+).instrument(database_helper.engines)
+app.add_middleware(
+    QueryStatsMiddleware, debug_headers=settings.query_stats.debug_headers
+)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(InternalAccessDenied)
+async def internal_access_denied_handler(request: Request, exc: InternalAccessDenied):
+    return InternalAccessDeniedErrorResponse()
+
 
 # catch all unexpected entity
 @app.exception_handler(RequestValidationError)
@@ -50,12 +86,16 @@ async def validation_exception_handler(
 
 
 app.include_router(pong_router, prefix=settings.api.prefix)
+app.include_router(health_router, prefix=settings.api.prefix)
 app.include_router(bids_router, prefix=settings.api.prefix)
 app.include_router(tenders_router, prefix=settings.api.prefix)
 app.include_router(employee_router, prefix=settings.api.prefix)
 app.include_router(organization_router, prefix=settings.api.prefix)
 app.include_router(organization_responsibles_router, prefix=settings.api.prefix)
+app.include_router(internal_router, prefix=settings.api.prefix)
 app.include_router(bids_router, prefix=settings.api.prefix)
+app.include_router(metrics_router)
+http_metrics.prepare(app.routes)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", reload=True)
@@ -0,0 +1,200 @@
+"""
+Схема на момент перехода с create_all на миграции.
+
+Таблицы заморожены здесь, а не взяты из моделей: следующие миграции
+меняют схему от этой точки. Все операции с проверкой существования,
+поэтому на базе, созданной create_all и scripts.create_indexes, миграция
+только досоздает недостающее. Индексы строятся обычным CREATE INDEX
+под блокировкой записи; на большой рабочей базе сначала запустите
+scripts.create_indexes.
+"""
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID as UUIDType
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex
+
+from core.models.business_enums import (
+    AuthorType,
+    BidStatus,
+    DecisionType,
+    OrganizationType,
+    ServiceType,
+    TenderStatus,
+)
+
+metadata = MetaData()
+
+
+def _id() -> Column:
+    return Column("id", UUIDType(as_uuid=True), primary_key=True, index=True)
+
+
+def _timestamps() -> list:
+    return [
+        Column("updated_at", DateTime, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+    ]
+
+
+def _changes() -> Column:
+    return Column("changes", JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+
+
+Table(
+    "employee",
+    metadata,
+    Column("username", String(50), unique=True, nullable=False),
+    Column("first_name", String(50), nullable=False),
+    Column("last_name", String(50), nullable=False),
+    _id(),
+    *_timestamps(),
+)
+Table(
+    "organization",
+    metadata,
+    Column("name", String(100), nullable=False),
+    Column("description", Text),
+    Column("type", Enum(OrganizationType)),
+    _id(),
+    *_timestamps(),
+)
+Table(
+    "organization_responsible",
+    metadata,
+    Column("organization_id", ForeignKey("organization.id"), nullable=False),
+    Column("user_id", ForeignKey("employee.id"), nullable=False),
+    _id(),
+    *_timestamps(),
+    Index(
+        "ix_organization_responsible_organization_id_user_id",
+        "organization_id",
+        "user_id",
+    ),
+    Index("ix_organization_responsible_user_id", "user_id"),
+)
+Table(
+    "tender",
+    metadata,
+    Column("name", String, nullable=False),
+    Column("description", String),
+    Column("service_type", Enum(ServiceType), nullable=False),
+    Column("status", Enum(TenderStatus), nullable=False),
+    Column("version", Integer, nullable=False),
+    Column("organization_id", ForeignKey("organization.id"), nullable=False),
+    Column("creator_username", String, ForeignKey("employee.username"), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    _id(),
+    Column("updated_at", DateTime, nullable=False),
+    Index("ix_tender_service_type_name", "service_type", "name", "id"),
+    Index("ix_tender_creator_username_name", "creator_username", "name", "id"),
+    Index("ix_tender_organization_id_name", "organization_id", "name", "id"),
+    Index("ix_tender_name", "name", "id"),
+)
+Table(
+    "tender_revision",
+    metadata,
+    Column("tender_id", ForeignKey("tender.id"), nullable=False),
+    Column("version", Integer, nullable=False),
+    Column("is_snapshot", Boolean, nullable=False),
+    _changes(),
+    _id(),
+    *_timestamps(),
+    Index("ix_tender_revision_tender_id_version", "tender_id", "version", unique=True),
+)
+Table(
+    "bid",
+    metadata,
+    Column("name", String, nullable=False),
+    Column("description", String, nullable=False),
+    Column("status", Enum(BidStatus), nullable=False),
+    Column("tender_id", ForeignKey("tender.id"), nullable=False),
+    Column("author_type", Enum(AuthorType), nullable=False),
+    Column("author_id", UUIDType(as_uuid=True), nullable=False),
+    Column("version", Integer, nullable=False),
+    _id(),
+    *_timestamps(),
+    Index("ix_bid_author_id_name", "author_id", "name", "id"),
+    Index("ix_bid_tender_id_author_id_name", "tender_id", "author_id", "name", "id"),
+)
+Table(
+    "bid_revision",
+    metadata,
+    Column("bid_id", ForeignKey("bid.id"), nullable=False),
+    Column("version", Integer, nullable=False),
+    Column("is_snapshot", Boolean, nullable=False),
+    _changes(),
+    _id(),
+    *_timestamps(),
+    Index("ix_bid_revision_bid_id_version", "bid_id", "version", unique=True),
+)
+Table(
+    "decision",
+    metadata,
+    Column("bid_id", ForeignKey("bid.id"), nullable=False),
+    Column("user_id", ForeignKey("employee.id"), nullable=False),
+    Column("decision_type", Enum(DecisionType), nullable=False),
+    _id(),
+    *_timestamps(),
+    Index("ix_decision_bid_id", "bid_id"),
+)
+Table(
+    "bid_decision_tally",
+    metadata,
+    Column("bid_id", ForeignKey("bid.id"), unique=True, nullable=False),
+    Column("approved_count", Integer, nullable=False),
+    Column("rejected_count", Integer, nullable=False),
+    Column("quorum_target", Integer, nullable=False),
+    _id(),
+    *_timestamps(),
+)
+Table(
+    "review",
+    metadata,
+    Column("description", String, nullable=False),
+    Column("bid_id", ForeignKey("bid.id"), nullable=False),
+    Column("reviewer_id", ForeignKey("employee.id"), nullable=False),
+    _id(),
+    *_timestamps(),
+)
+
+# полнотекстовый поиск (core.search), только PostgreSQL
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+)
+POSTGRES_SEARCH_DDL = [
+    statement
+    for table in ("tender", "bid")
+    for statement in (
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector "
+        f"ON {table} USING gin (search_vector)",
+    )
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await conn.run_sync(metadata.create_all, checkfirst=True)
+    # create_all строит индексы только новых таблиц
+    for table in metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda idx: idx.name):
+            await conn.execute(CreateIndex(index, if_not_exists=True))
+    if conn.dialect.name == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            await conn.execute(text(statement))
@@ -0,0 +1,31 @@
+"""
+Индексы фильтров списка тендеров по status и created_at.
+
+Без них такие фильтры без service_type обходят ix_tender_name целиком.
+На большой рабочей базе сначала запустите scripts.create_indexes.
+"""
+
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table
+from sqlalchemy.dialects.postgresql import UUID as UUIDType
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex
+
+# только колонки индексов, остальная схема - в 0001_baseline
+tender = Table(
+    "tender",
+    MetaData(),
+    Column("id", UUIDType(as_uuid=True), primary_key=True),
+    Column("name", String),
+    Column("status", String),
+    Column("created_at", DateTime),
+)
+
+INDEXES = (
+    Index("ix_tender_status_name", tender.c.status, tender.c.name, tender.c.id),
+    Index("ix_tender_created_at", tender.c.created_at),
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for index in INDEXES:
+        await conn.execute(CreateIndex(index, if_not_exists=True))
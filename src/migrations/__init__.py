@@ -0,0 +1 @@
+"""Миграции схемы, см. core.migrations."""
@@ -0,0 +1,222 @@
+"""
+Прогоняет CRUD-функции на тестовых данных, делает EXPLAIN каждого SELECT
+и завершается с кодом 1, если хоть один запрос читает таблицу целиком.
+
+    python -m scripts.check_query_plans
+
+Данные создаются внутри транзакции и откатываются. На PostgreSQL
+последовательное сканирование запрещается через enable_seqscan = off:
+если план все равно содержит Seq Scan, подходящего индекса нет.
+Полный обход индекса (SQLite: SCAN ... USING INDEX, PostgreSQL: Index Scan
+без Index Cond) - тоже чтение всей таблицы, только в порядке индекса:
+так выполняются фильтры, которых нет в индексе. Он допустим лишь в
+запросах без WHERE, которые и должны читать все строки по порядку.
+Драйвер SQLite не поддерживает вложенные транзакции, поэтому там
+проверку стоит запускать на отдельной базе.
+"""
+
+import asyncio
+import json
+import re
+import sys
+from datetime import timedelta
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from api.bids import crud as bids_crud
+from api.bids.dependices import resolve_bid_access
+from api.tenders import crud as tenders_crud
+from api.tenders.dependies import TenderFilters, resolve_tender_access
+from core.etag import page_etag
+from core.models.business_enums import (
+    AuthorType,
+    BidStatus,
+    DecisionType,
+    OrganizationType,
+    ServiceType,
+    TenderStatus,
+)
+from core.models.business_models import Employee, Organization, OrganizationResponsible
+from core.models.db_helper import database_helper
+from core.pagination import Cursor
+from core.schemas.bid import BidCreate, BidUpdate
+from core.schemas.tender import TenderCreate, TenderUpdate
+
+SQLITE_FULL_SCAN = re.compile(r"^SCAN \w+$")
+SQLITE_INDEX_WALK = re.compile(r"^SCAN \w+ USING (?:COVERING )?INDEX \w+$")
+WHERE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+
+
+async def run_workload(session: AsyncSession) -> None:
+    suffix = uuid4().hex[:8]
+    user = Employee(username=f"plan_{suffix}", first_name="plan", last_name="plan")
+    organization = Organization(name="plan", type=OrganizationType.LLC)
+    session.add_all([user, organization])
+    await session.flush()
+    session.add(
+        OrganizationResponsible(organization_id=organization.id, user_id=user.id)
+    )
+    await session.commit()
+
+    tender = await tenders_crud.create_tender(
+        session,
+        TenderCreate(
+            name="plan",
+            description="plan",
+            service_type=ServiceType.DELIVERY,
+            status=TenderStatus.CREATED,
+            organization_id=organization.id,
+            creator_username=user.username,
+        ),
+    )
+    cursor = Cursor(key=tender.name, id=tender.id)
+    delivery = TenderFilters(service_types=(ServiceType.DELIVERY,))
+    await tenders_crud.get_tenders(session, 5, 0, delivery)
+    await tenders_crud.get_tenders(session, 5, 0, delivery, cursor)
+    await page_etag(session, tenders_crud.tenders_page(5, 0, delivery, cursor))
+    for filters in (
+        TenderFilters(),
+        TenderFilters(
+            service_types=(ServiceType.DELIVERY, ServiceType.CONSTRUCTION),
+            statuses=(TenderStatus.PUBLISHED,),
+        ),
+        TenderFilters(organization_ids=(organization.id,)),
+        TenderFilters(statuses=(TenderStatus.PUBLISHED,)),
+        # открытый с одной стороны диапазон почти не отбирает строк, для него
+        # планировщик честно выбирает обход ix_tender_name с LIMIT
+        TenderFilters(
+            created_from=tender.created_at,
+            created_to=tender.created_at + timedelta(days=1),
+        ),
+    ):
+        await tenders_crud.get_tenders(session, 5, 0, filters)
+        await tenders_crud.get_tenders(session, 5, 0, filters, cursor)
+        await tenders_crud.count_tenders(session, filters)
+    await tenders_crud.get_user_tenders(session, 5, 0, user.username)
+    await tenders_crud.get_user_tenders(session, 5, 0, user.username, cursor)
+    await tenders_crud.get_tender(session, tender.id)
+    await resolve_tender_access(session, tender.id, user.username)
+    tender = await tenders_crud.change_tender_status(
+        session, tender, TenderStatus.PUBLISHED
+    )
+    tender = await tenders_crud.update_tender(
+        session, tender, TenderUpdate(name="plan 2")
+    )
+    states = await tenders_crud.get_tender_versions(session, tender, [1, 2])
+    await tenders_crud.rollback_tender(session, tender, states[1])
+    await tenders_crud.get_tender_revisions(session, tender.id, 5, 0)
+    await tenders_crud.get_tender_revisions(
+        session, tender.id, 5, 0, Cursor(key=1, id=tender.id)
+    )
+
+    bid = await bids_crud.create_bid(
+        session,
+        BidCreate(
+            name="plan",
+            description="plan",
+            tender_id=tender.id,
+            author_type=AuthorType.ORGANIZATION,
+            author_id=organization.id,
+        ),
+    )
+    cursor = Cursor(key=bid.name, id=bid.id)
+    await bids_crud.get_user_bids(session, 5, 0, organization.id)
+    await bids_crud.get_user_bids(session, 5, 0, organization.id, cursor)
+    await bids_crud.get_bids_list_for_tender(session, tender.id, organization.id, 5, 0)
+    await bids_crud.get_bids_list_for_tender(
+        session, tender.id, organization.id, 5, 0, cursor
+    )
+    await page_etag(
+        session, bids_crud.tender_bids_page(tender.id, organization.id, 5, 0)
+    )
+    await resolve_bid_access(session, bid.id, user.username)
+    bid = await bids_crud.change_big_status(session, bid, BidStatus.PUBLISHED)
+    bid = await bids_crud.update_bid(
+        session, bid, BidUpdate(name="plan 2", description="plan")
+    )
+    states = await bids_crud.get_bid_versions(session, bid, [1, 2])
+    bid = await bids_crud.rollback_bid(session, bid, states[1])
+    await bids_crud.get_bid_revisions(session, bid.id, 5, 0)
+    await bids_crud.get_bid_revisions(session, bid.id, 5, 0, Cursor(key=1, id=bid.id))
+    await bids_crud.submit_decision(session, bid, DecisionType.APPROVED, user.id)
+    await bids_crud.get_decision_summary(session, bid)
+    await bids_crud.send_feedback(session, bid, "plan", user.id)
+
+
+def _postgres_full_scans(node: dict, index_walks: bool) -> list[str]:
+    found = []
+    kind = node["Node Type"]
+    if kind == "Seq Scan":
+        found.append(f"Seq Scan on {node['Relation Name']}")
+    elif (
+        index_walks
+        and kind in ("Index Scan", "Index Only Scan")
+        and "Index Cond" not in node
+    ):
+        found.append(f"{kind} using {node['Index Name']} without Index Cond")
+    for child in node.get("Plans", ()):
+        found += _postgres_full_scans(child, index_walks)
+    return found
+
+
+async def explain(conn: AsyncConnection, statement: str, parameters) -> list[str]:
+    index_walks = WHERE.search(statement) is not None
+    if conn.dialect.name == "postgresql":
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _postgres_full_scans(plan[0]["Plan"], index_walks)
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [
+        row[-1]
+        for row in result
+        if SQLITE_FULL_SCAN.match(row[-1])
+        or (index_walks and SQLITE_INDEX_WALK.match(row[-1]))
+    ]
+
+
+async def check_query_plans(engine: AsyncEngine) -> dict[str, list[str]]:
+    statements: dict[str, object] = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.setdefault(statement, parameters)
+
+    async with engine.connect() as conn:
+        await conn.begin()
+        event.listen(conn.sync_connection, "before_cursor_execute", capture)
+        async with AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        ) as session:
+            await run_workload(session)
+        event.remove(conn.sync_connection, "before_cursor_execute", capture)
+
+        if conn.dialect.name == "postgresql":
+            await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        failures = {}
+        for statement, parameters in statements.items():
+            if full_scans := await explain(conn, statement, parameters):
+                failures[statement] = full_scans
+        await conn.rollback()
+    return failures
+
+
+async def main() -> int:
+    try:
+        failures = await check_query_plans(database_helper.engine)
+    finally:
+        await database_helper.dispose()
+    for statement, full_scans in failures.items():
+        print(f"FULL SCAN: {'; '.join(full_scans)}\n  {statement}\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
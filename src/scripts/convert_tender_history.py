@@ -0,0 +1,118 @@
+"""
+Переносит старую историю тендеров (полные копии в tender_history)
+в tender_revision в виде снимков.
+
+    python -m scripts.convert_tender_history
+
+Каждая старая строка - полное состояние версии, поэтому она становится
+снимком и восстанавливается без соседних версий. Уже перенесенные версии
+пропускаются, скрипт можно запускать повторно. Старая таблица не удаляется.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    select,
+)
+from sqlalchemy.dialects.postgresql import UUID as UUIDType
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from api.tenders.crud import TENDER_VERSIONED_FIELDS
+from core.history import capture_state
+from core.models.business_enums import ServiceType, TenderStatus
+from core.models.business_models import TenderRevision
+from core.models.db_helper import database_helper
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# Схема tender_history до перехода на дельты
+legacy_tender_history = Table(
+    "tender_history",
+    MetaData(),
+    Column("id", UUIDType(as_uuid=True), primary_key=True),
+    Column("refer_tender_id", UUIDType(as_uuid=True), nullable=False),
+    Column("name", String, nullable=False),
+    Column("description", String),
+    Column("service_type", Enum(ServiceType), nullable=False),
+    Column("status", Enum(TenderStatus), nullable=False),
+    Column("version", Integer, nullable=False),
+    Column("organization_id", UUIDType(as_uuid=True), nullable=False),
+    Column("creator_username", String, nullable=False),
+    Column("updated_at", DateTime),
+    Column("created_at", DateTime),
+    Index("ix_tender_history_refer_tender_id_version", "refer_tender_id", "version"),
+)
+
+
+async def convert_tender_history(engine: AsyncEngine) -> int:
+    async with engine.begin() as conn:
+        has_legacy = await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).has_table("tender_history")
+        )
+        if not has_legacy:
+            logger.info("Таблицы tender_history нет, переносить нечего")
+            return 0
+
+        legacy = legacy_tender_history.c
+        converted = (
+            select(TenderRevision.id)
+            .where(
+                TenderRevision.tender_id == legacy.refer_tender_id,
+                TenderRevision.version == legacy.version,
+            )
+            .exists()
+        )
+        stmt = (
+            select(legacy_tender_history)
+            .where(~converted)
+            .order_by(legacy.id)
+            .limit(BATCH_SIZE)
+        )
+        # для строк без отметок времени
+        converted_at = (await conn.execute(select(func.now()))).scalar()
+        total, last_id = 0, None
+        while True:
+            page = stmt if last_id is None else stmt.where(legacy.id > last_id)
+            rows = (await conn.execute(page)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            revisions = [
+                {
+                    "tender_id": row.refer_tender_id,
+                    "version": row.version,
+                    "is_snapshot": True,
+                    "changes": capture_state(row, TENDER_VERSIONED_FIELDS),
+                    "created_at": row.updated_at or row.created_at or converted_at,
+                }
+                for row in rows
+            ]
+            await conn.execute(TenderRevision.__table__.insert(), revisions)
+            total += len(revisions)
+            logger.info("Перенесено версий: %d", total)
+    return total
+
+
+async def main() -> None:
+    try:
+        await convert_tender_history(database_helper.engine)
+    finally:
+        await database_helper.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Строит индексы моделей на живой базе без блокировки записи.
+
+    python -m scripts.create_indexes
+
+Миграции (scripts.migrate) строят индексы обычным CREATE INDEX под
+блокировкой записи, на большой рабочей базе этот скрипт стоит запустить
+до них: уже существующие индексы миграции пропускают.
+На PostgreSQL он же добавляет колонки полнотекстового поиска: ALTER TABLE
+с генерируемой колонкой переписывает таблицу под эксклюзивной блокировкой,
+на большой таблице его стоит запускать в окно обслуживания.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateIndex
+
+from core.models import business_models  # noqa: F401  регистрирует модели
+from core.models.base import Base
+from core.models.db_helper import database_helper
+from core.search import SEARCHABLE
+
+logger = logging.getLogger(__name__)
+
+INVALID_INDEX_STMT = text(
+    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+    "WHERE c.relname = :name AND NOT i.indisvalid"
+)
+
+
+async def _drop_invalid_index(conn: AsyncConnection, name: str) -> None:
+    # Прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс,
+    # который IF NOT EXISTS молча пропустит.
+    if (await conn.execute(INVALID_INDEX_STMT, {"name": name})).first():
+        logger.warning("Удаляем невалидный индекс %s", name)
+        await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+async def create_indexes_concurrently(engine: AsyncEngine) -> list[str]:
+    created = []
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        is_postgres = conn.dialect.name == "postgresql"
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda idx: idx.name):
+                if is_postgres:
+                    index.dialect_options["postgresql"]["concurrently"] = True
+                    await _drop_invalid_index(conn, index.name)
+                await conn.execute(CreateIndex(index, if_not_exists=True))
+                created.append(index.name)
+                logger.info("Индекс %s готов", index.name)
+        if is_postgres:
+            for searchable in SEARCHABLE:
+                await _drop_invalid_index(conn, searchable.index_name)
+                for ddl in searchable.ddl(concurrently=True):
+                    await conn.execute(ddl)
+                created.append(searchable.index_name)
+                logger.info("Индекс %s готов", searchable.index_name)
+    return created
+
+
+async def main() -> None:
+    try:
+        await create_indexes_concurrently(database_helper.engine)
+    finally:
+        await database_helper.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
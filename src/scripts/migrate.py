@@ -0,0 +1,53 @@
+"""
+Применяет миграции схемы (migrations/NNNN_*.py) до последней ревизии.
+
+    python -m scripts.migrate            # до последней ревизии
+    python -m scripts.migrate --to 3     # до указанной
+    python -m scripts.migrate --check    # только сверить, код 1, если база отстает
+
+Запускается один раз перед стартом воркеров (в том числе при выкатке),
+воркеры сами схему не меняют. Параллельные запуски на PostgreSQL
+выполняются по очереди под advisory-блокировкой.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Optional
+
+from core.migrations import (
+    SchemaRevisionError,
+    check_schema_revision,
+    head_revision,
+    upgrade,
+)
+from core.models.db_helper import database_helper
+
+logger = logging.getLogger(__name__)
+
+
+async def main(check: bool, target: Optional[int]) -> int:
+    try:
+        if check:
+            try:
+                current = await check_schema_revision(database_helper.engine)
+            except SchemaRevisionError as exc:
+                logger.error("%s", exc)
+                return 1
+            logger.info("Ревизия схемы %s, последняя %s", current, head_revision())
+            return 0
+        applied = await upgrade(database_helper.engine, target)
+        logger.info("Применено миграций: %s", len(applied))
+    finally:
+        await database_helper.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", action="store_true", help="только сверить")
+    parser.add_argument("--to", type=int, default=None, help="целевая ревизия")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main(args.check, args.to)))
@@ -0,0 +1,149 @@
+"""
+Пересчитывает bid_decision_tally по таблице decision.
+
+    python -m scripts.rebuild_decision_tallies          # исправить расхождения
+    python -m scripts.rebuild_decision_tallies --check  # только сверить
+
+С --check код выхода 1, если счетчики расходятся с решениями.
+
+Нужен после первого развертывания счетчиков (решения, поданные раньше,
+в них не учтены) и для сверки. На PostgreSQL таблица счетчиков на время
+пересчета блокируется от записи, голоса ждут его окончания.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Dict, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, delete, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models.business_enums import DecisionType
+from core.models.business_models import (
+    Bid,
+    BidDecisionTally,
+    Decision,
+    OrganizationResponsible,
+)
+from core.models.db_helper import database_helper
+
+logger = logging.getLogger(__name__)
+
+Tally = Tuple[int, int, int]
+
+# блокирует вставку и обновление счетчиков, чтение остается доступным
+LOCK_TALLIES_STMT = text("LOCK TABLE bid_decision_tally IN SHARE ROW EXCLUSIVE MODE")
+
+
+async def expected_tallies(session: AsyncSession) -> Dict[UUID, Tally]:
+    responsibles = (
+        select(
+            OrganizationResponsible.organization_id,
+            func.count().label("total"),
+        )
+        .group_by(OrganizationResponsible.organization_id)
+        .subquery()
+    )
+    total = func.coalesce(responsibles.c.total, 0)
+    stmt = (
+        select(
+            Decision.bid_id,
+            func.count().filter(Decision.decision_type == DecisionType.APPROVED),
+            func.count().filter(Decision.decision_type == DecisionType.REJECTED),
+            case((total < 3, total), else_=3),
+        )
+        .join(Bid, Bid.id == Decision.bid_id)
+        .outerjoin(responsibles, responsibles.c.organization_id == Bid.author_id)
+        .group_by(Decision.bid_id, total)
+    )
+    result = await session.execute(stmt)
+    return {bid_id: tuple(tally) for bid_id, *tally in result}
+
+
+async def stored_tallies(session: AsyncSession) -> Dict[UUID, Tally]:
+    stmt = select(
+        BidDecisionTally.bid_id,
+        BidDecisionTally.approved_count,
+        BidDecisionTally.rejected_count,
+        BidDecisionTally.quorum_target,
+    )
+    result = await session.execute(stmt)
+    return {bid_id: tuple(tally) for bid_id, *tally in result}
+
+
+async def rebuild_decision_tallies(session: AsyncSession, check: bool) -> int:
+    """Возвращает число расхождений; без check исправляет их и коммитит."""
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(LOCK_TALLIES_STMT)
+    expected = await expected_tallies(session)
+    stored = await stored_tallies(session)
+
+    missing = [bid_id for bid_id in expected if bid_id not in stored]
+    wrong = [
+        bid_id
+        for bid_id, tally in expected.items()
+        if bid_id in stored and stored[bid_id] != tally
+    ]
+    orphaned = [bid_id for bid_id in stored if bid_id not in expected]
+    for bid_id in wrong:
+        logger.warning(
+            "Предложение %s: в счетчиках %s, по решениям %s",
+            bid_id,
+            stored[bid_id],
+            expected[bid_id],
+        )
+    logger.info(
+        "Нет счетчиков: %d, расходятся: %d, лишние: %d",
+        len(missing),
+        len(wrong),
+        len(orphaned),
+    )
+    if check:
+        return len(missing) + len(wrong) + len(orphaned)
+
+    if missing:
+        await session.execute(
+            insert(BidDecisionTally),
+            [_tally_row(bid_id, expected[bid_id]) for bid_id in missing],
+        )
+    for bid_id in wrong:
+        await session.execute(
+            update(BidDecisionTally)
+            .where(BidDecisionTally.bid_id == bid_id)
+            .values(_tally_row(bid_id, expected[bid_id]))
+        )
+    if orphaned:
+        await session.execute(
+            delete(BidDecisionTally).where(BidDecisionTally.bid_id.in_(orphaned))
+        )
+    await session.commit()
+    return len(missing) + len(wrong) + len(orphaned)
+
+
+def _tally_row(bid_id: UUID, tally: Tally) -> dict:
+    approved, rejected, quorum_target = tally
+    return {
+        "bid_id": bid_id,
+        "approved_count": approved,
+        "rejected_count": rejected,
+        "quorum_target": quorum_target,
+    }
+
+
+async def main(check: bool) -> int:
+    try:
+        async with database_helper.session_factory() as session:
+            mismatches = await rebuild_decision_tallies(session, check)
+    finally:
+        await database_helper.dispose()
+    return 1 if check and mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", action="store_true", help="только сверить")
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main(parser.parse_args().check)))
@@ -0,0 +1,175 @@
+"""
+Запуск в продакшене: несколько воркеров uvicorn без перезагрузчика.
+
+    python -m server
+
+Настройка - SERVER={"workers": 0, "backlog": 2048, "keep_alive": 65, ...}.
+Родительский процесс открывает сокет, делит бюджет соединений с базой
+между воркерами (пул каждого передается им через DB_CONFIG), очищает
+каталог метрик и запускает воркеры; упавший или отработавший max_requests
+воркер supervisor uvicorn поднимает заново. По SIGTERM воркер сначала
+HEALTH.pre_stop_delay секунд отвечает "не готов" с открытыми сокетами,
+затем закрывает их и дожидается запросов в работе. uvloop и httptools берутся,
+если установлены.
+"""
+
+import logging
+import math
+import os
+import random
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    """Ядра процесса с учетом привязки и квоты cgroup v2 (контейнер)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def worker_pool(
+    pool_size: int, max_overflow: int, budget: Optional[int], workers: int
+) -> Tuple[int, int]:
+    """
+    pool_size и max_overflow одного воркера, чтобы все воркеры вместе
+    держали не больше budget соединений; пропорция между ними сохраняется.
+    """
+    if budget is not None and budget < workers:
+        # меньше одного соединения на воркер не бывает, бюджет был бы превышен
+        raise ValueError(
+            f"SERVER.db_connection_budget={budget} меньше числа воркеров {workers}"
+        )
+    limit = pool_size + max_overflow
+    if budget is None or limit * workers <= budget:
+        return pool_size, max_overflow
+    per_worker = budget // workers
+    size = max(1, per_worker * pool_size // limit)
+    return size, max(0, per_worker - size)
+
+
+def clear_metrics_dir(directory: Optional[str]) -> None:
+    # файлы прошлого запуска с чужими pid складывались бы в счетчики
+    if directory is None:
+        return
+    for path in Path(directory).glob("*.json"):
+        path.unlink(missing_ok=True)
+    for path in Path(directory).glob("*.tmp"):
+        path.unlink(missing_ok=True)
+
+
+class WorkerServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config) -> None:
+        super().__init__(config)
+        self._exit_at: Optional[float] = None
+        self._exit_signal: Optional[int] = None
+
+    def handle_exit(self, sig: int, frame) -> None:
+        # Первый сигнал только снимает готовность: сокеты еще открыты,
+        # балансировщик успевает увидеть 503 на /health/ready и убрать воркер.
+        # Через pre_stop_delay uvicorn закрывает сокеты и дожидается запросов.
+        delay = settings.health.pre_stop_delay
+        if self._exit_at is not None or delay <= 0:
+            super().handle_exit(sig, frame)
+            return
+        from core.health import readiness_probe
+
+        readiness_probe.shutting_down = True
+        self._exit_at = time.monotonic() + delay
+        self._exit_signal = sig
+
+    async def on_tick(self, counter: int) -> bool:
+        if self._exit_at is not None and time.monotonic() >= self._exit_at:
+            self._exit_at = None
+            super().handle_exit(self._exit_signal, None)
+        return await super().on_tick(counter)
+
+    def run(self, sockets=None) -> None:
+        # свой разброс у каждого воркера, чтобы они не перезапускались разом
+        if self.config.limit_max_requests is not None:
+            self.config.limit_max_requests += random.randint(
+                0, settings.server.max_requests_jitter
+            )
+        super().run(sockets)
+
+
+def main() -> None:
+    server = settings.server
+    workers = server.workers or available_cpus()
+
+    db_config = settings.db_config
+    pool_size, max_overflow = worker_pool(
+        db_config.pool_size,
+        db_config.max_overflow,
+        server.db_connection_budget,
+        workers,
+    )
+    if pool_size + max_overflow < settings.health.min_pool_headroom:
+        logger.warning(
+            "Пул воркера (%s) меньше min_pool_headroom, readiness не пройдет",
+            pool_size + max_overflow,
+        )
+    # воркеры запускаются через spawn и читают настройки заново из окружения
+    os.environ["DB_CONFIG"] = db_config.model_copy(
+        update={"pool_size": pool_size, "max_overflow": max_overflow}
+    ).model_dump_json()
+
+    clear_metrics_dir(settings.metrics.multiprocess_dir)
+    if workers > 1 and settings.metrics.multiprocess_dir is None:
+        logger.warning(
+            "METRICS.multiprocess_dir не задан: /metrics покажет один воркер"
+        )
+    if workers > 1 and settings.response_cache.backend == "lru":
+        # сброс после записи виден только воркеру, который писал
+        logger.warning(
+            "RESPONSE_CACHE.backend=lru при %s воркерах: другие воркеры отдают "
+            "старые страницы тендеров до %s с; общий кэш - redis",
+            workers,
+            settings.response_cache.ttl,
+        )
+
+    config = uvicorn.Config(
+        "main:app",
+        host=server.host,
+        port=server.port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        backlog=server.backlog,
+        timeout_keep_alive=server.keep_alive,
+        limit_max_requests=server.max_requests,
+        timeout_graceful_shutdown=math.ceil(settings.health.drain_timeout),
+        server_header=False,
+    )
+    logger.info(
+        "Воркеров %s, пул на воркер %s + %s, max_requests %s",
+        workers,
+        pool_size,
+        max_overflow,
+        server.max_requests,
+    )
+    sock = config.bind_socket()
+    # supervisor и при одном воркере: иначе после max_requests процесс
+    # завершился бы и никто не поднял бы его заново
+    Multiprocess(config, target=WorkerServer(config).run, sockets=[sock]).run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,12 @@
+import os
+import tempfile
+from pathlib import Path
+
+from benchmarks.run import configure
+
+# Настройки читаются при первом импорте приложения, поэтому база задается
+# до сбора тестов: TEST_DATABASE_URL или временный файл SQLite.
+configure(
+    os.environ.get("TEST_DATABASE_URL")
+    or f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'tests.db'}"
+)
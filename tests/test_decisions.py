@@ -0,0 +1,119 @@
+"""
+Счетчики голосов и закрытие тендера по кворуму на последовательных голосах.
+Идет на любой базе, по умолчанию на SQLite; гонку проверяет
+test_concurrent_votes.py на PostgreSQL.
+"""
+
+import asyncio
+
+import httpx
+from sqlalchemy import func, select
+
+from benchmarks.concurrent_votes import seed
+
+VOTERS = 4
+QUORUM = 3
+
+
+async def _tender_state(tender_id):
+    from core.models.business_models import Tender, TenderRevision
+    from core.models.db_helper import database_helper
+
+    async with database_helper.session_factory() as session:
+        tender = await session.get(Tender, tender_id)
+        revisions = await session.scalar(
+            select(func.count())
+            .select_from(TenderRevision)
+            .where(TenderRevision.tender_id == tender_id)
+        )
+        return tender.status, tender.version, revisions
+
+
+def _run(scenario):
+    import main
+    from api.employees.dependices import employee_cache
+    from api.organization_responsibles.dependices import membership_cache
+    from core.config import settings
+    from core.models.db_helper import database_helper
+
+    async def run():
+        employee_cache.clear()
+        membership_cache.clear()
+        try:
+            usernames, bids = await seed(database_helper.engine, VOTERS, 2)
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url=f"http://test{settings.api.prefix}"
+            ) as client:
+                return await scenario(client, usernames, bids)
+        finally:
+            await database_helper.dispose()
+
+    return asyncio.run(run())
+
+
+async def _vote(client, bid, username, decision="Approved"):
+    response = await client.put(
+        f"/bids/{bid['id']}/submit_decision",
+        params={"decision": decision, "username": username},
+    )
+    assert response.status_code == 200, response.text
+    return response
+
+
+async def _summary(client, bid, username):
+    response = await client.get(
+        f"/bids/{bid['id']}/decisions/summary", params={"username": username}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_quorum_closes_tender_once():
+    from core.models.business_enums import TenderStatus
+
+    async def scenario(client, usernames, bids):
+        bid = bids[0]
+        status, version, revisions = await _tender_state(bid["tender_id"])
+        assert status == TenderStatus.PUBLISHED
+
+        for username in usernames[: QUORUM - 1]:
+            await _vote(client, bid, username)
+        assert await _tender_state(bid["tender_id"]) == (status, version, revisions)
+
+        await _vote(client, bid, usernames[QUORUM - 1])
+        closed = await _tender_state(bid["tender_id"])
+        assert closed == (TenderStatus.CLOSED, version + 1, revisions + 1)
+
+        # голос после кворума не закрывает тендер повторно
+        await _vote(client, bid, usernames[QUORUM])
+        assert await _tender_state(bid["tender_id"]) == closed
+
+        assert await _summary(client, bid, usernames[0]) == {
+            "bid_id": str(bid["id"]),
+            "approved_count": VOTERS,
+            "rejected_count": 0,
+            "quorum_target": QUORUM,
+            "quorum_reached": True,
+        }
+
+    _run(scenario)
+
+
+def test_rejection_blocks_quorum():
+    from core.models.business_enums import TenderStatus
+
+    async def scenario(client, usernames, bids):
+        bid = bids[1]
+        await _vote(client, bid, usernames[0], decision="Rejected")
+        for username in usernames[1:]:
+            await _vote(client, bid, username)
+
+        status, _, _ = await _tender_state(bid["tender_id"])
+        assert status == TenderStatus.PUBLISHED
+        summary = await _summary(client, bid, usernames[0])
+        assert summary["approved_count"] == VOTERS - 1
+        assert summary["rejected_count"] == 1
+        assert summary["quorum_reached"] is False
+
+    _run(scenario)